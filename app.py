@@ -1,11 +1,26 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, session
+from flask import Flask, Response, render_template, request, redirect, url_for, flash, jsonify, session
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
 from werkzeug.security import generate_password_hash, check_password_hash
-from models import db, Voter, Election, Candidate, Vote, BlockchainState, PendingTransaction
+from sqlalchemy import select, insert, update, delete, func
+from sqlalchemy.exc import IntegrityError
+from models import (db, Voter, Election, Candidate, Vote, BlockchainState, PendingTransaction, CandidateTally,
+                    ensure_indexes, ensure_candidate_tallies, increment_candidate_tally)
 from forms import RegistrationForm, LoginForm, ElectionForm, CandidateForm, EditCandidateForm, VoteForm, AdminForm
-from blockchain import Blockchain
+from blockchain import Blockchain, DuplicateVoteError
+from consensus import ProofOfWork, ProofOfAuthority, load_authority_key
+from block_store import BlockStore
+from mining import ParallelMiner
+from query_budget import init_query_budget
+from sqlite_tuning import sqlite_engine_options, init_sqlite_pragmas, require_full_sync
+from results_cache import ResultsCache, FileResultsBackend
+from results_stream import ResultsBroadcaster
+from seal_scheduler import SealScheduler
+from ballot_queue import BallotQueue
+from chain_metrics import InclusionMetrics
 import json
 import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 import time
 from datetime import datetime, timedelta
 import os
@@ -23,15 +38,69 @@ app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get(
     f"sqlite:///{os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'voting_system.db')}"
 )
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = sqlite_engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
 
 # Initialize extensions
 db.init_app(app)
+# The web workers, the ballot writer and the miner all write to the same
+# SQLite file; WAL and a busy timeout make them wait for each other
+with app.app_context():
+    init_sqlite_pragmas(db.engine, {'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT', 15000))})
 login_manager = LoginManager()
 login_manager.init_app(app)
 login_manager.login_view = 'login'
 
-# Initialize blockchain
-blockchain = Blockchain()
+# SQL statements each list page may issue per request, including the
+# logged-in user lookup; exceeding one fails the request when enforced
+init_query_budget(app, {
+    'index': 2,
+    'elections': 3,
+    'admin_elections': 2,
+    'results': 3,
+})
+
+# Initialize blockchain, reloading any blocks persisted by a previous run.
+# Web workers get a read-only view of the shared block store; the miner
+# (miner.py, or the thread started under __main__) is the single writer.
+app.config['BLOCKCHAIN_STORE_PATH'] = os.environ.get(
+    'BLOCKCHAIN_STORE_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'blockchain.db')
+)
+
+# CONSENSUS=poa replaces the nonce search with an Ed25519 signature from the
+# authority key; blocks below POA_ACTIVATION_HEIGHT keep their proof-of-work
+if os.environ.get('CONSENSUS', 'pow') == 'poa':
+    consensus = ProofOfAuthority(
+        load_authority_key(os.environ.get(
+            'AUTHORITY_KEY_PATH',
+            os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'authority_key.pem')
+        )),
+        activation_height=int(os.environ.get('POA_ACTIVATION_HEIGHT', 1))
+    )
+else:
+    consensus = ProofOfWork()
+blockchain = Blockchain(store=BlockStore(app.config['BLOCKCHAIN_STORE_PATH']), writable=False, consensus=consensus)
+
+# Election results are cached per chain height; RESULTS_CACHE_DIR adds a
+# file store shared by every worker on the host
+results_cache_dir = os.environ.get('RESULTS_CACHE_DIR')
+results_cache = ResultsCache(backend=FileResultsBackend(results_cache_dir) if results_cache_dir else None)
+
+def cached_election_results(election_id):
+    """Blockchain results for an election, recomputed only after a new block"""
+    return results_cache.get(election_id, len(blockchain.chain),
+                             lambda: blockchain.get_election_results(election_id))
+
+# One fan-out per election pushes tally deltas to live results subscribers
+results_broadcaster = ResultsBroadcaster(blockchain)
+
+# A block is sealed once SEAL_BATCH_SIZE transactions are pending or the oldest
+# has waited SEAL_MAX_LATENCY seconds, whichever comes first
+seal_scheduler = SealScheduler(
+    batch_size=int(os.environ.get('SEAL_BATCH_SIZE', 100)),
+    max_latency=float(os.environ.get('SEAL_MAX_LATENCY', 2.0))
+)
+inclusion_metrics = InclusionMetrics(blockchain)
 
 # Custom Jinja2 filters
 @app.template_filter('datetime')
@@ -49,6 +118,11 @@ def datetime_filter(timestamp):
     except:
         return str(timestamp)
 
+@app.before_request
+def refresh_blockchain():
+    """Pick up blocks sealed by the miner process since the last request"""
+    blockchain.refresh()
+
 @login_manager.user_loader
 def load_user(user_id):
     return Voter.query.get(user_id)
@@ -62,67 +136,271 @@ def init_db():
             os.makedirs(instance_path)
         
         db.create_all()
+        ensure_indexes()
+        ensure_candidate_tallies()
         
         # Create initial blockchain state if it doesn't exist
-        if not BlockchainState.query.first():
-            blockchain_state = BlockchainState()
-            db.session.add(blockchain_state)
+        state = BlockchainState.query.first()
+        if not state:
+            state = BlockchainState()
+            db.session.add(state)
+        
+        # Stores written before the transaction index existed are indexed here,
+        # once, rather than by every process that opens them
+        blockchain.store.backfill_index()
+        
+        # Keep the stored state in step with the chain reloaded from disk
+        latest_block = blockchain.get_latest_block()
+        state.last_block_index = latest_block.index
+        state.last_block_hash = latest_block.hash
+        db.session.commit()
+
+# Serializes block sealing between the mining thread and the admin action
+sealing_lock = threading.Lock()
+
+def seal_pending_transactions(miner_address):
+    """Mine every pending transaction into blocks and link the vote records to them
+    
+    Returns the number of transactions sealed into new blocks. A large
+    backlog is split into blocks within the chain's size limits and drained
+    as a pipeline: the next block is mined on a helper thread while the
+    previous one is committed.
+    """
+    with sealing_lock:
+        pending_txs = PendingTransaction.query.order_by(PendingTransaction.timestamp).all()
+        if not pending_txs:
+            return 0
+        
+        # Convert to blockchain format, decoding each payload once; the chain
+        # refuses a second vote by the same voter in an election
+        pending = {}
+        duplicates = []
+        # A seal that failed part way leaves its rows in the database: some are
+        # back in the chain's pool, others were sealed but never linked
+        pool_ids = {t.transaction_id for t in blockchain.pending_transactions}
+        sealed_earlier = {}
+        for tx in pending_txs:
+            tx_data = json.loads(tx.data)
+            if tx.id in pool_ids:
+                pending[tx.id] = (tx.transaction_type, tx_data)
+                continue
+            # Only votes are refused as duplicates; anything else is looked up first
+            located = blockchain.locate_transaction(tx.id) if tx.transaction_type != 'vote' else None
+            if located is None:
+                try:
+                    blockchain.add_transaction(tx.sender, tx.recipient, tx_data,
+                                               transaction_id=tx.id, timestamp=tx.timestamp)
+                    pending[tx.id] = (tx.transaction_type, tx_data)
+                    continue
+                except DuplicateVoteError as e:
+                    located = blockchain.locate_transaction(tx.id)
+                    if located is None:
+                        # A second vote by the voter under another transaction id
+                        print(f"Rejected pending transaction {tx.id}: {e}")
+                        duplicates.append(tx.id)
+                        continue
+            block = located[0]
+            sealed_earlier.setdefault(block.index, (block, {}))[1][tx.id] = (tx.transaction_type, tx_data)
+        discard_pending_transactions(duplicates)
+        for block, block_pending in sealed_earlier.values():
+            commit_sealed_block(block, block_pending)
+        if not pending:
+            return 0
+        
+        blocks = blockchain.mine_pending_blocks(miner_address)
+        try:
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                next_block = executor.submit(next, blocks, None)
+                while True:
+                    block = next_block.result()
+                    if block is None:
+                        break
+                    next_block = executor.submit(next, blocks, None)
+                    commit_sealed_block(block, pending)
+        finally:
+            # On failure, put the batches that were not mined back in the pool now
+            blocks.close()
+        
+        # Votes the chain dropped again at sealing never reach a block
+        rejected = [tx.transaction_id for tx in blockchain.rejected_transactions]
+        blockchain.rejected_transactions = []
+        discard_pending_transactions(rejected)
+        return len(pending) - len(rejected)
+
+def commit_ballots(ballots):
+    """Write a batch of queued ballots as pending transactions and vote records in one transaction
+    
+    Should the batch collide with votes already in the database (cast through
+    another worker, or written before a crash and replayed from the journal),
+    it is retried one ballot at a time and the colliding ballots are skipped.
+    """
+    with app.app_context():
+        try:
+            add_ballots(ballots)
             db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            for ballot in ballots:
+                try:
+                    add_ballots([ballot])
+                    db.session.commit()
+                except IntegrityError:
+                    db.session.rollback()
+                    print(f"Skipped ballot {ballot['id']}: voter {ballot['voter_id']} has already voted")
+    seal_scheduler.notify(len(ballots))
+
+def add_ballots(ballots):
+    """Stage pending transactions, vote records and counter updates for a batch of ballots"""
+    # The journal is truncated once these rows are in, so they must not wait for a WAL checkpoint
+    require_full_sync(db.session)
+    db.session.execute(insert(PendingTransaction), [{
+        'id': ballot['id'],
+        'transaction_type': 'vote',
+        'sender': ballot['voter_id'],
+        'recipient': 'ELECTION_SYSTEM',
+        'data': json.dumps({
+            'type': 'vote',
+            'election_id': ballot['election_id'],
+            'candidate': ballot['candidate'],
+            'candidate_id': ballot['candidate_id'],
+            'voter_id': ballot['voter_id']
+        }),
+        'timestamp': ballot['timestamp']
+    } for ballot in ballots])
+    # Vote records get their transaction_hash once the ballot is sealed
+    db.session.execute(insert(Vote), [{
+        'voter_id': ballot['voter_pk'],
+        'election_id': ballot['election_id'],
+        'candidate_id': ballot['candidate_id']
+    } for ballot in ballots])
+    counts = Counter((ballot['candidate_id'], ballot['election_id']) for ballot in ballots)
+    for (candidate_id, election_id), count in counts.items():
+        increment_candidate_tally(candidate_id, election_id, count)
+
+# Votes are acknowledged once journaled under BALLOT_JOURNAL_DIR and written
+# to the database in batches by one writer thread per process
+ballot_queue = BallotQueue(
+    os.environ.get('BALLOT_JOURNAL_DIR',
+                   os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'ballots')),
+    commit_ballots
+)
+
+def discard_pending_transactions(transaction_ids):
+    """Delete pending transactions that will never be sealed"""
+    if transaction_ids:
+        db.session.execute(delete(PendingTransaction).where(PendingTransaction.id.in_(transaction_ids)))
+        db.session.commit()
+
+def commit_sealed_block(block, pending):
+    """Link the votes of a sealed block to it and drop its transactions from the pending pool
+    
+    The database work is batched: one IN query each for voters and votes,
+    one bulk UPDATE of the votes and one bulk DELETE of the pending rows.
+    """
+    leaf_hashes = {t.transaction_id: leaf.hex() for t, leaf in zip(block.transactions, block.leaf_hashes())}
+    sealed_ids = [tx_id for tx_id in leaf_hashes if tx_id in pending]
+    block_votes = [(tx_id, pending[tx_id][1]) for tx_id in sealed_ids if pending[tx_id][0] == 'vote']
+    
+    # Resolve all voters and their unlinked vote records in one query each
+    if block_votes:
+        voter_ids = {tx_data.get('voter_id') for _, tx_data in block_votes}
+        voters = dict(db.session.execute(
+            select(Voter.voter_id, Voter.id).where(Voter.voter_id.in_(voter_ids))
+        ).all())
+        votes = {
+            (row.voter_id, row.election_id, row.candidate_id): row.id
+            for row in db.session.execute(
+                select(Vote.id, Vote.voter_id, Vote.election_id, Vote.candidate_id)
+                .where(Vote.voter_id.in_(voters.values()), Vote.transaction_hash.is_(None))
+            )
+        }
+        
+        # Update vote records with transaction hashes
+        updates = []
+        for tx_id, tx_data in block_votes:
+            vote_id = votes.get((voters.get(tx_data.get('voter_id')),
+                                 tx_data.get('election_id'),
+                                 tx_data.get('candidate_id')))
+            if vote_id:
+                updates.append({'id': vote_id, 'transaction_hash': leaf_hashes[tx_id], 'block_index': block.index})
+        if updates:
+            db.session.execute(update(Vote), updates)
+    
+    # Remove pending transactions
+    db.session.execute(
+        delete(PendingTransaction).where(PendingTransaction.id.in_(sealed_ids))
+    )
+    
+    # Update blockchain state
+    state = BlockchainState.query.first()
+    if state:
+        # Blocks linked late, after a failed seal, must not move the state back
+        if block.index >= (state.last_block_index or 0):
+            state.last_block_index = block.index
+            state.last_block_hash = block.hash
+        state.total_transactions += len(sealed_ids)
+        state.last_updated = datetime.utcnow()
+    
+    db.session.commit()
+
+def reconcile_candidate_tallies(fix=False):
+    """Check every candidate counter against the votes on the chain plus those still pending
+    
+    Returns a list of (candidate_id, counter, expected) mismatches; with fix=True
+    the counters are reset to the expected value.
+    """
+    # Sealed votes on the chain, plus votes still waiting in the pending pool;
+    # blocks the miner sealed since this process last looked are read first
+    blockchain.refresh()
+    expected = {}
+    for votes in blockchain.election_votes.values():
+        for _, transaction in votes:
+            candidate_id = transaction.data.get('candidate_id')
+            expected[candidate_id] = expected.get(candidate_id, 0) + 1
+    pending = select(PendingTransaction.id, PendingTransaction.data).where(PendingTransaction.transaction_type == 'vote')
+    for tx_id, tx_data in db.session.execute(pending):
+        # A row left behind after its block was sealed is already counted above
+        if blockchain.locate_transaction(tx_id) is not None:
+            continue
+        candidate_id = json.loads(tx_data).get('candidate_id')
+        expected[candidate_id] = expected.get(candidate_id, 0) + 1
+    
+    mismatches = []
+    for tally in CandidateTally.query.all():
+        expected_count = expected.get(tally.candidate_id, 0)
+        if tally.vote_count != expected_count:
+            mismatches.append((tally.candidate_id, tally.vote_count, expected_count))
+            if fix:
+                tally.vote_count = expected_count
+    
+    if fix:
+        db.session.commit()
+    return mismatches
 
 def mine_pending_transactions():
-    """Mine pending transactions in the background"""
+    """Mine pending transactions in the background as the seal scheduler asks"""
     with app.app_context():
         while True:
             try:
-                # Get pending transactions from database
-                pending_txs = PendingTransaction.query.all()
-                if pending_txs:
-                    # Convert to blockchain format
-                    for tx in pending_txs:
-                        tx_data = json.loads(tx.data)
-                        blockchain.add_transaction(tx.sender, tx.recipient, tx_data)
-                    
-                    # Mine the block
-                    blockchain.mine_pending_transactions("SYSTEM_MINER")
-                    
-                    # Get the latest block hash
-                    latest_block = blockchain.get_latest_block()
-                    block_hash = latest_block.hash
-                    
-                    # Update vote records with transaction hashes
-                    for tx in pending_txs:
-                        if tx.transaction_type == 'vote':
-                            tx_data = json.loads(tx.data)
-                            # Find the corresponding vote record
-                            vote = Vote.query.filter_by(
-                                voter_id=Voter.query.filter_by(voter_id=tx_data['voter_id']).first().id,
-                                election_id=tx_data['election_id'],
-                                candidate_id=tx_data['candidate_id']
-                            ).first()
-                            
-                            if vote and not vote.transaction_hash:
-                                vote.transaction_hash = block_hash
-                                vote.block_index = len(blockchain.chain) - 1
-                    
-                    # Remove pending transactions
-                    for tx in pending_txs:
-                        db.session.delete(tx)
-                    
-                    # Update blockchain state
-                    state = BlockchainState.query.first()
-                    if state:
-                        state.last_block_index = len(blockchain.chain) - 1
-                        state.last_block_hash = block_hash
-                        state.total_transactions += len(pending_txs)
-                        state.last_updated = datetime.utcnow()
-                    
-                    db.session.commit()
-                    print(f"Mined block {len(blockchain.chain) - 1} with {len(pending_txs)} transactions")
+                # One aggregate query tells whether a batch is full or its deadline passed
+                pending, oldest = db.session.execute(
+                    select(func.count(PendingTransaction.id), func.min(PendingTransaction.timestamp))
+                ).one()
+                db.session.rollback()
+                delay = seal_scheduler.delay(pending, oldest)
+                if delay:
+                    seal_scheduler.wait(delay)
+                    continue
                 
-                time.sleep(10)  # Mine every 10 seconds
+                sealed = seal_pending_transactions("SYSTEM_MINER")
+                if sealed:
+                    metrics = inclusion_metrics.snapshot()
+                    print(f"Mined block {len(blockchain.chain) - 1} with {sealed} transactions "
+                          f"({metrics['votes_per_second']} votes/s, p99 inclusion {metrics['inclusion_latency_p99']}s)")
             except Exception as e:
+                db.session.rollback()
                 print(f"Error in mining: {e}")
-                time.sleep(30)
+                time.sleep(seal_scheduler.poll_interval)
 
 @app.route('/')
 def index():
@@ -184,7 +462,14 @@ def logout():
 def elections():
     """List all elections"""
     elections = Election.query.filter_by(is_active=True).order_by(Election.start_date.desc()).all()
-    return render_template('elections.html', elections=elections, now=datetime.now())
+    
+    # Count candidates for every listed election in one aggregate query
+    candidate_counts = dict(db.session.execute(
+        select(Candidate.election_id, func.count())
+        .where(Candidate.election_id.in_([election.id for election in elections]))
+        .group_by(Candidate.election_id)
+    ).all())
+    return render_template('elections.html', elections=elections, candidate_counts=candidate_counts, now=datetime.now())
 
 @app.route('/election/<election_id>')
 def election_detail(election_id):
@@ -203,9 +488,10 @@ def vote(election_id):
         flash('This election is not currently open for voting.', 'error')
         return redirect(url_for('election_detail', election_id=election_id))
     
-    # Check if user has already voted
-    existing_vote = Vote.query.filter_by(voter_id=current_user.id, election_id=election_id).first()
-    if existing_vote:
+    # Check if user has already voted; sealed and queued votes are answered in memory
+    if (blockchain.has_voted(election_id, current_user.voter_id) or
+            ballot_queue.is_queued(election_id, current_user.voter_id) or
+            Vote.query.filter_by(voter_id=current_user.id, election_id=election_id).first()):
         flash('You have already voted in this election.', 'error')
         return redirect(url_for('election_detail', election_id=election_id))
     
@@ -215,35 +501,22 @@ def vote(election_id):
     if form.validate_on_submit():
         candidate = Candidate.query.get(form.candidate.data)
         
-        # Create vote transaction
-        vote_data = {
-            'type': 'vote',
-            'election_id': election_id,
-            'candidate': candidate.name,
-            'candidate_id': candidate.id,
-            'voter_id': current_user.voter_id
-        }
+        # Journal the ballot; the writer thread adds the pending transaction,
+        # the vote record and the counter update in its next batch
+        try:
+            receipt = ballot_queue.submit({
+                'election_id': election_id,
+                'candidate': candidate.name,
+                'candidate_id': candidate.id,
+                'voter_id': current_user.voter_id,
+                'voter_pk': current_user.id,
+                'timestamp': time.time()
+            })
+        except DuplicateVoteError:
+            flash('You have already voted in this election.', 'error')
+            return redirect(url_for('election_detail', election_id=election_id))
         
-        # Add to pending transactions
-        pending_tx = PendingTransaction(
-            transaction_type='vote',
-            sender=current_user.voter_id,
-            recipient='ELECTION_SYSTEM',
-            data=json.dumps(vote_data),
-            timestamp=time.time()
-        )
-        db.session.add(pending_tx)
-        
-        # Create vote record (transaction_hash will be set after mining)
-        vote = Vote(
-            voter_id=current_user.id,
-            election_id=election_id,
-            candidate_id=candidate.id
-        )
-        db.session.add(vote)
-        db.session.commit()
-        
-        flash('Your vote has been cast and will be added to the blockchain shortly.', 'success')
+        flash(f'Your vote has been cast and will be added to the blockchain shortly. Receipt: {receipt}', 'success')
         return redirect(url_for('election_detail', election_id=election_id))
     
     return render_template('vote.html', form=form, election=election, candidates=candidates)
@@ -254,14 +527,17 @@ def results(election_id):
     election = Election.query.get_or_404(election_id)
     
     # Get results from blockchain
-    blockchain_results = blockchain.get_election_results(election_id)
+    blockchain_results = cached_election_results(election_id)
     
-    # Get results from database
-    votes = Vote.query.filter_by(election_id=election_id).all()
+    # Get results from the materialized per-candidate counters
+    tallies = db.session.execute(
+        select(Candidate.name, CandidateTally.vote_count)
+        .join(CandidateTally, CandidateTally.candidate_id == Candidate.id)
+        .where(CandidateTally.election_id == election_id, CandidateTally.vote_count > 0)
+    ).all()
     candidate_votes = {}
-    for vote in votes:
-        candidate_name = vote.candidate.name
-        candidate_votes[candidate_name] = candidate_votes.get(candidate_name, 0) + 1
+    for candidate_name, vote_count in tallies:
+        candidate_votes[candidate_name] = candidate_votes.get(candidate_name, 0) + vote_count
     
     return render_template('results.html', 
                          election=election, 
@@ -306,6 +582,7 @@ def admin_candidates(election_id):
             description=form.description.data,
             election_id=election_id
         )
+        candidate.tally = CandidateTally(election_id=election_id, vote_count=0)
         db.session.add(candidate)
         db.session.commit()
         flash('Candidate added successfully!', 'success')
@@ -370,41 +647,38 @@ def admin_blockchain():
     if form.validate_on_submit():
         if form.action.data == 'mine':
             # Trigger mining
-            pending_txs = PendingTransaction.query.all()
-            if pending_txs:
-                for tx in pending_txs:
-                    tx_data = json.loads(tx.data)
-                    blockchain.add_transaction(tx.sender, tx.recipient, tx_data)
-                
-                blockchain.mine_pending_transactions("ADMIN_MINER")
-                
-                # Update database
-                for tx in pending_txs:
-                    db.session.delete(tx)
-                
-                state = BlockchainState.query.first()
-                if state:
-                    state.last_block_index = len(blockchain.chain) - 1
-                    state.last_block_hash = blockchain.get_latest_block().hash
-                    state.total_transactions += len(pending_txs)
-                    state.last_updated = datetime.utcnow()
-                
-                db.session.commit()
-                flash(f'Mined block {len(blockchain.chain) - 1} with {len(pending_txs)} transactions', 'success')
+            if not blockchain.writable:
+                flash('Blocks are sealed by the miner process; pending transactions will be mined shortly', 'info')
             else:
-                flash('No pending transactions to mine', 'info')
+                sealed = seal_pending_transactions("ADMIN_MINER")
+                if sealed:
+                    flash(f'Mined block {len(blockchain.chain) - 1} with {sealed} transactions', 'success')
+                else:
+                    flash('No pending transactions to mine', 'info')
         
-        elif form.action.data == 'validate':
-            is_valid = blockchain.is_chain_valid()
+        elif form.action.data in ('validate', 'audit'):
+            # 'validate' only checks blocks sealed since the last verified one;
+            # 'audit' re-verifies the whole chain in parallel chunks
+            if form.action.data == 'audit':
+                is_valid = blockchain.audit_chain()
+            else:
+                is_valid = blockchain.is_chain_valid()
+            
+            state = BlockchainState.query.first()
+            if state:
+                state.chain_valid = is_valid
+                db.session.commit()
+            
             if is_valid:
-                flash('Blockchain is valid!', 'success')
+                flash(f'Blockchain is valid! Verified up to block {blockchain.verified_index}.', 'success')
             else:
                 flash('Blockchain validation failed!', 'error')
         
         elif form.action.data == 'export':
-            # Export blockchain data
-            blockchain_data = blockchain.to_dict()
-            return jsonify(blockchain_data)
+            # Export blockchain data one block per line
+            response = Response(stream_blocks_ndjson(), mimetype='application/x-ndjson')
+            response.headers['Content-Disposition'] = 'attachment; filename=blockchain.ndjson'
+            return response
     
     # Get blockchain stats
     state = BlockchainState.query.first()
@@ -416,24 +690,134 @@ def admin_blockchain():
                          pending_count=pending_count,
                          chain_length=len(blockchain.chain))
 
+# Largest page served by the paginated block endpoint
+MAX_BLOCKS_PER_PAGE = 100
+
+def stream_blocks_ndjson(start=0, limit=None):
+    """Yield the chain as newline-delimited JSON, one block at a time"""
+    for block in blockchain.iter_blocks(start, limit):
+        yield json.dumps(block.to_dict()) + '\n'
+
+def stream_blockchain_json():
+    """Yield the same document as Blockchain.to_dict() without building it in memory"""
+    yield '{"chain": ['
+    for i, block in enumerate(blockchain.iter_blocks()):
+        yield (', ' if i else '') + json.dumps(block.to_dict())
+    yield '], "pending_transactions": ' + json.dumps([tx.to_dict() for tx in blockchain.pending_transactions])
+    yield ', "difficulty": ' + json.dumps(blockchain.difficulty)
+    yield ', "mining_reward": ' + json.dumps(blockchain.mining_reward) + '}'
+
+@app.route('/api/metrics')
+def api_metrics():
+    """Vote throughput and time-to-inclusion over the recent blocks"""
+    metrics = inclusion_metrics.snapshot()
+    metrics['chain_length'] = len(blockchain.chain)
+    metrics['seal_batch_size'] = seal_scheduler.batch_size
+    metrics['seal_max_latency'] = seal_scheduler.max_latency
+    return jsonify(metrics)
+
 @app.route('/api/blockchain')
 def api_blockchain():
     """API endpoint to get blockchain data"""
-    return jsonify(blockchain.to_dict())
+    return Response(stream_blockchain_json(), mimetype='application/json')
+
+@app.route('/api/blockchain/export.ndjson')
+def api_blockchain_ndjson():
+    """API endpoint to stream the blockchain as NDJSON"""
+    return Response(stream_blocks_ndjson(), mimetype='application/x-ndjson')
+
+@app.route('/api/blockchain/blocks')
+def api_blockchain_blocks():
+    """API endpoint to page through blocks with a from/limit cursor"""
+    start = max(request.args.get('from', 0, type=int), 0)
+    limit = min(max(request.args.get('limit', MAX_BLOCKS_PER_PAGE, type=int), 1), MAX_BLOCKS_PER_PAGE)
+    blocks = [block.to_dict() for block in blockchain.iter_blocks(start, limit)]
+    next_from = start + len(blocks)
+    return jsonify({
+        'blocks': blocks,
+        'next': next_from if next_from < len(blockchain.chain) else None
+    })
 
 @app.route('/api/election/<election_id>/results')
 def api_election_results(election_id):
     """API endpoint to get election results"""
-    results = blockchain.get_election_results(election_id)
-    return jsonify(results)
+    # Results only change when the chain grows, so pollers can revalidate cheaply
+    etag = results_cache.etag(election_id, len(blockchain.chain))
+    if etag in request.if_none_match:
+        return Response(status=304, headers={'ETag': f'"{etag}"'})
+    
+    response = jsonify(cached_election_results(election_id))
+    response.set_etag(etag)
+    return response
 
-# Initialize database when app starts (for deployment)
-with app.app_context():
+@app.route('/api/election/<election_id>/results/stream')
+def api_election_results_stream(election_id):
+    """Server-Sent Events stream of tally deltas as blocks are sealed"""
+    last_event_id = request.headers.get('Last-Event-ID', -1, type=int)
+    return Response(results_broadcaster.listen(election_id, last_event_id), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+@app.route('/api/transaction/<transaction_id>/proof')
+def api_transaction_proof(transaction_id):
+    """API endpoint to get a Merkle inclusion proof for a transaction"""
+    proof = blockchain.get_transaction_proof(transaction_id)
+    if proof is None:
+        return jsonify({'error': 'Transaction not found in a sealed block'}), 404
+    return jsonify(proof)
+
+@app.route('/api/receipt/<transaction_id>')
+def api_receipt(transaction_id):
+    """API endpoint to look up a sealed transaction by its receipt"""
+    located = blockchain.locate_transaction(transaction_id)
+    if located is None:
+        return jsonify({'error': 'Transaction not found in a sealed block'}), 404
+    block, position = located
+    return jsonify({
+        'transaction': block.transactions[position].to_dict(),
+        'block_index': block.index,
+        'block_hash': block.hash,
+        'position': position,
+        'confirmations': len(blockchain.chain) - block.index
+    })
+
+@app.route('/api/voter/<voter_id>/audit')
+def api_voter_audit(voter_id):
+    """API endpoint listing every sealed transaction of a voter"""
+    return jsonify({
+        'voter_id': voter_id,
+        'transactions': [
+            dict(transaction.to_dict(), block_index=block_index)
+            for block_index, transaction in blockchain.get_address_transactions(voter_id)
+        ]
+    })
+
+@app.cli.command('init-db')
+def init_db_command():
+    """Create the database schema and sync it with the blockchain"""
     init_db()
+    print("✅ Database initialized")
+
+def start_miner():
+    """Make this process the single chain writer and run the mining loop"""
+    blockchain.writable = True
+    
+    # Search nonces on every core unless MINING_WORKERS=1
+    workers = int(os.environ.get('MINING_WORKERS', os.cpu_count() or 1))
+    if workers > 1:
+        blockchain.miner = ParallelMiner(workers)
+    blockchain.max_block_transactions = int(os.environ.get('MAX_BLOCK_TRANSACTIONS', blockchain.max_block_transactions))
+    blockchain.max_block_bytes = int(os.environ.get('MAX_BLOCK_BYTES', blockchain.max_block_bytes))
+    # Ballots acknowledged by a web worker that died before writing them
+    ballot_queue.recover()
+    mine_pending_transactions()
 
 if __name__ == '__main__':
+    init_db()
+    
     # Start mining thread
-    mining_thread = threading.Thread(target=mine_pending_transactions, daemon=True)
+    mining_thread = threading.Thread(target=start_miner, daemon=True)
     mining_thread.start()
     
     # Get port from environment variable (for deployment)
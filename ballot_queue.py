@@ -0,0 +1,207 @@
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from blockchain import DuplicateVoteError
+
+try:
+    import fcntl
+except ImportError:  # Windows: journals of crashed processes are not recovered automatically
+    fcntl = None
+
+# Ballots written to the database per transaction by the writer thread
+MAX_BATCH = 500
+
+class BallotJournal:
+    """Append-only file of accepted ballots, fsynced in groups before they are acknowledged
+
+    Each process writes its own journal and holds an exclusive lock on it, so
+    a journal that can be locked by someone else belongs to a process that
+    died and can be replayed.
+    """
+
+    def __init__(self, directory: str):
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        self.path = os.path.join(directory, f'ballots-{uuid.uuid4().hex}.log')
+        # Locked under a name recover_journals skips, so another process can
+        # never take the new journal for a dead one before it is locked
+        self._file = open(self.path + '.tmp', 'ab')
+        if fcntl is not None:
+            fcntl.flock(self._file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        os.rename(self.path + '.tmp', self.path)
+        self._condition = threading.Condition()
+        self._written = 0
+        self._synced = 0
+        self._syncing = False
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """Write a ballot and return once it is on disk
+
+        Concurrent callers share one fsync: whoever finds no sync in progress
+        flushes everything written so far while the others wait for it.
+        """
+        line = json.dumps(record, separators=(',', ':')).encode() + b'\n'
+        with self._condition:
+            self._file.write(line)
+            self._written += 1
+            sequence = self._written
+            while self._synced < sequence:
+                if self._syncing:
+                    self._condition.wait()
+                    continue
+                self._syncing = True
+                target = self._written
+                self._file.flush()
+                self._condition.release()
+                try:
+                    os.fsync(self._file.fileno())
+                finally:
+                    self._condition.acquire()
+                    self._syncing = False
+                self._synced = max(self._synced, target)
+                self._condition.notify_all()
+
+    def truncate(self) -> None:
+        """Drop every journaled ballot once all of them are in the database"""
+        with self._condition:
+            self._file.flush()
+            self._file.truncate(0)
+            os.fsync(self._file.fileno())
+
+def recover_journals(directory: str) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+    """Yield (path, ballots) for every journal left behind by a process that died"""
+    if fcntl is None or not os.path.isdir(directory):
+        return
+    for name in sorted(os.listdir(directory)):
+        if not (name.startswith('ballots-') and name.endswith('.log')):
+            continue
+        path = os.path.join(directory, name)
+        try:
+            f = open(path, 'rb')
+        except FileNotFoundError:
+            continue  # Replayed and removed by another process meanwhile
+        with f:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                continue  # Still owned by a live process
+            if not os.path.exists(path):
+                continue
+            ballots = []
+            for line in f:
+                try:
+                    ballots.append(json.loads(line))
+                except ValueError:
+                    break  # A torn final write was never acknowledged
+            yield path, ballots
+
+class BallotQueue:
+    """Acknowledge ballots once journaled and write them to the database in batches
+
+    Requests only validate, journal and enqueue a ballot; a single writer
+    thread per process group-commits queued ballots with commit_batch, so
+    concurrent voters do not contend for the database write lock.
+    """
+
+    def __init__(self, journal_dir: str, commit_batch: Callable[[List[Dict[str, Any]]], None],
+                 max_batch: int = MAX_BATCH, retry_interval: float = 1.0):
+        self.journal_dir = journal_dir
+        self.commit_batch = commit_batch
+        self.max_batch = max_batch
+        self.retry_interval = retry_interval
+        self._condition = threading.Condition()
+        self._queue: deque = deque()
+        self._queued_votes: Set[Tuple[str, str]] = set()
+        self._in_flight = 0
+        self._journal: Optional[BallotJournal] = None
+        self._writer: Optional[threading.Thread] = None
+
+    def submit(self, ballot: Dict[str, Any]) -> str:
+        """Durably accept a ballot and return its receipt id"""
+        vote_key = (ballot['election_id'], ballot['voter_id'])
+        with self._condition:
+            if vote_key in self._queued_votes:
+                raise DuplicateVoteError(f"Voter {vote_key[1]} already has a ballot queued in election {vote_key[0]}")
+            self._queued_votes.add(vote_key)
+            self._ensure_writer()
+            journal = self._journal
+
+        ballot = dict(ballot, id=ballot.get('id') or str(uuid.uuid4()))
+        try:
+            journal.append(ballot)
+        except Exception:
+            with self._condition:
+                self._queued_votes.discard(vote_key)
+            raise
+
+        with self._condition:
+            self._queue.append(ballot)
+            self._condition.notify_all()
+        return ballot['id']
+
+    def is_queued(self, election_id: str, voter_id: str) -> bool:
+        """Whether this process holds a ballot by the voter that is not yet in the database"""
+        with self._condition:
+            return (election_id, voter_id) in self._queued_votes
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every accepted ballot has been written to the database"""
+        deadline = None if timeout is None else time.time() + timeout
+        with self._condition:
+            while self._queue or self._in_flight:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def _ensure_writer(self) -> None:
+        if self._writer is None:
+            self._journal = BallotJournal(self.journal_dir)
+            self._writer = threading.Thread(target=self._run, daemon=True)
+            self._writer.start()
+
+    def _run(self) -> None:
+        self.recover()
+        while True:
+            with self._condition:
+                while not self._queue:
+                    self._condition.wait()
+                batch = [self._queue.popleft() for _ in range(min(self.max_batch, len(self._queue)))]
+                self._in_flight = len(batch)
+
+            while True:
+                try:
+                    self.commit_batch(batch)
+                    break
+                except Exception as e:
+                    # The ballots are journaled; keep retrying rather than dropping them
+                    print(f"Error writing ballots: {e}")
+                    time.sleep(self.retry_interval)
+
+            with self._condition:
+                self._in_flight = 0
+                for ballot in batch:
+                    self._queued_votes.discard((ballot['election_id'], ballot['voter_id']))
+                # Ballots are registered here before they are journaled, so an
+                # empty set means every journaled ballot is in the database
+                if not self._queued_votes:
+                    self._journal.truncate()
+                self._condition.notify_all()
+
+    def recover(self) -> None:
+        """Write the ballots journaled by processes that died before committing them"""
+        try:
+            for path, ballots in recover_journals(self.journal_dir):
+                for start in range(0, len(ballots), self.max_batch):
+                    self.commit_batch(ballots[start:start + self.max_batch])
+                os.remove(path)
+                print(f"Recovered {len(ballots)} journaled ballots from {path}")
+        except Exception as e:
+            # Leave the journal in place for the next process to replay
+            print(f"Error recovering journaled ballots: {e}")
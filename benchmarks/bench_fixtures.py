@@ -0,0 +1,47 @@
+"""
+Shared fixtures for the benchmark scripts
+Importing this module has no side effects: each script sets up its own
+temporary database and block store before importing app
+"""
+
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+from werkzeug.security import generate_password_hash
+
+from models import db, Voter, Election, Candidate
+
+CANDIDATES = ['Candidate A', 'Candidate B', 'Candidate C', 'Candidate D']
+
+def create_election(voters):
+    """Insert an open election with candidates and a batch of registered voters"""
+    election = Election(
+        title='Benchmark Election',
+        start_date=datetime.now() - timedelta(hours=1),
+        end_date=datetime.now() + timedelta(days=1)
+    )
+    db.session.add(election)
+    db.session.flush()
+    candidates = [Candidate(name=name, election_id=election.id) for name in CANDIDATES]
+    db.session.add_all(candidates)
+
+    # Hashing a password per voter would dominate setup; they all share one
+    password_hash = generate_password_hash('benchmark')
+    run = uuid.uuid4().hex[:6]
+    rows = [{
+        'id': str(uuid.uuid4()),
+        'username': f'bench_{run}_{i}',
+        'email': f'bench_{run}_{i}@example.com',
+        'password_hash': password_hash,
+        'first_name': 'Bench',
+        'last_name': f'Voter{i}',
+        'date_of_birth': datetime(1990, 1, 1).date(),
+        'voter_id': f'B{run}{i:08d}',
+        'is_verified': True,
+        'is_active': True
+    } for i in range(voters)]
+    db.session.execute(insert(Voter), rows)
+    db.session.commit()
+    return election.id, [candidate.id for candidate in candidates], [row['id'] for row in rows]
+
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Ingestion Benchmark for Blockchain Voting System
+This script reports POST /vote throughput at increasing numbers of concurrent
+clients against a threaded server
+"""
+
+import argparse
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep the run away from the real database and block store; app reads these at import
+BENCH_DIR = tempfile.mkdtemp(prefix='voting-ingest-')
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(BENCH_DIR, 'voting_system.db')}"
+os.environ['BLOCKCHAIN_STORE_PATH'] = os.path.join(BENCH_DIR, 'blockchain.db')
+os.environ['BALLOT_JOURNAL_DIR'] = os.path.join(BENCH_DIR, 'ballots')
+
+from werkzeug.serving import make_server
+
+import app as voting_app
+from app import app, init_db
+from models import Vote
+from bench_fixtures import create_election
+
+class NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+def session_cookie(voter_id):
+    """Signed Flask session logging a voter in, as /login would set it"""
+    serializer = app.session_interface.get_signing_serializer(app)
+    return f"{app.config.get('SESSION_COOKIE_NAME', 'session')}={serializer.dumps({'_user_id': voter_id, '_fresh': True})}"
+
+def run_clients(url, clients, ballots):
+    """Post every ballot from a pool of concurrent clients; return votes/sec"""
+    opener = urllib.request.build_opener(NoRedirect)
+    lock = threading.Lock()
+    remaining = list(ballots)
+    errors = []
+
+    def client():
+        while True:
+            with lock:
+                if not remaining:
+                    return
+                voter_id, candidate_id = remaining.pop()
+            request = urllib.request.Request(url, data=urllib.parse.urlencode({'candidate': candidate_id}).encode(),
+                                             headers={'Cookie': session_cookie(voter_id)})
+            try:
+                opener.open(request)
+            except urllib.error.HTTPError as e:
+                if e.code != 302:
+                    errors.append(e.code)
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    assert not errors, f"{len(errors)} requests failed: {errors[:5]}"
+    return len(ballots) / elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--clients', type=int, nargs='+', default=[50, 100, 250, 500])
+    parser.add_argument('--votes', type=int, default=1000, help='votes cast per concurrency level')
+    args = parser.parse_args()
+
+    app.config['WTF_CSRF_ENABLED'] = False
+    with app.app_context():
+        init_db()
+
+    # One access-log line per request would dominate the output
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    try:
+        print(f"🗳️  POST /vote throughput ({args.votes} votes per run)")
+        print(f"{'clients':>8} {'votes/s':>10} {'written':>9}")
+        for clients in args.clients:
+            with app.app_context():
+                election_id, candidate_ids, voter_ids = create_election(args.votes)
+            ballots = [(voter_id, candidate_ids[i % len(candidate_ids)]) for i, voter_id in enumerate(voter_ids)]
+            url = f"http://127.0.0.1:{server.server_port}/vote/{election_id}"
+            rate = run_clients(url, clients, ballots)
+
+            # Wait for queued ballots so every run starts from an idle writer
+            ballot_queue = getattr(voting_app, 'ballot_queue', None)
+            if ballot_queue is not None:
+                ballot_queue.flush()
+            with app.app_context():
+                written = Vote.query.filter_by(election_id=election_id).count()
+            print(f"{clients:>8} {rate:>10.1f} {written:>9}")
+    finally:
+        server.shutdown()
+        shutil.rmtree(BENCH_DIR, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Memory Benchmark for Blockchain Voting System
+This script reports the resident bytes-per-vote of Blockchain.chain and its tally index
+"""
+
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+import uuid
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from blockchain import Blockchain
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--votes', type=int, default=100000)
+    parser.add_argument('--block-size', type=int, default=1000)
+    parser.add_argument('--elections', type=int, default=10)
+    parser.add_argument('--candidates', type=int, default=5)
+    args = parser.parse_args()
+
+    blockchain = Blockchain()
+    # Proof-of-work is irrelevant to memory use
+    blockchain.difficulty = 1
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+
+    for i in range(args.votes):
+        election = i % args.elections
+        candidate = i % args.candidates
+        # Ids are built per vote, as they would be when decoded from the database
+        blockchain.add_transaction(f'VOTER{i:08d}', 'ELECTION_SYSTEM', {
+            'type': 'vote',
+            'election_id': str(uuid.UUID(int=election)),
+            'candidate': f'Candidate {candidate}',
+            'candidate_id': str(uuid.UUID(int=1000 + candidate)),
+            'voter_id': f'VOTER{i:08d}'
+        }, transaction_id=str(uuid.uuid4()))
+        if len(blockchain.pending_transactions) >= args.block_size:
+            blockchain.mine_pending_transactions('BENCH_MINER')
+    blockchain.mine_pending_transactions('BENCH_MINER')
+
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    print(f"🧠 {args.votes} votes in {len(blockchain.chain)} blocks")
+    print(f"   Total: {used / 1024 / 1024:.1f} MiB")
+    print(f"   Bytes per vote: {used / args.votes:.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Mining Benchmark for Blockchain Voting System
+This script compares blocks/sec of the single-threaded and parallel nonce search
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from blockchain import Block
+from mining import ParallelMiner
+
+def make_block(index):
+    """Create a block holding a handful of vote transactions"""
+    transactions = [
+        {
+            'sender': f'VOTER{i:04d}',
+            'recipient': 'ELECTION_SYSTEM',
+            'data': {'type': 'vote', 'election_id': 'bench', 'candidate': 'Candidate A'},
+            'timestamp': time.time(),
+            'transaction_id': f'bench-{index}-{i}'
+        }
+        for i in range(10)
+    ]
+    return Block(index, transactions, time.time(), '0' * 64)
+
+def blocks_per_second(difficulty, blocks, miner=None):
+    """Mine a number of blocks and return the achieved rate"""
+    start = time.perf_counter()
+    for index in range(blocks):
+        block = make_block(index + 1)
+        block.mine_block(difficulty, miner)
+        assert block.hash == block.calculate_hash()
+    return blocks / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--difficulties', type=int, nargs='+', default=[4, 5, 6])
+    parser.add_argument('--blocks', type=int, default=3, help='blocks mined per measurement')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    miner = ParallelMiner(args.workers)
+    # Start the worker processes before timing anything
+    miner.search(b'warm-up', 1)
+
+    print(f"⛏️  Mining benchmark ({args.workers} workers, {args.blocks} blocks per run)")
+    print(f"{'difficulty':>10} {'single blk/s':>14} {'parallel blk/s':>16} {'speedup':>9}")
+    try:
+        for difficulty in args.difficulties:
+            single = blocks_per_second(difficulty, args.blocks)
+            parallel = blocks_per_second(difficulty, args.blocks, miner)
+            print(f"{difficulty:>10} {single:>14.3f} {parallel:>16.3f} {parallel / single:>8.2f}x")
+    finally:
+        miner.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Serialization Benchmark for Blockchain Voting System
+This script compares the canonical JSON and binary encodings of vote blocks:
+encoded size, encode and decode rate, and the time to hash the Merkle leaves
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import timeit
+import uuid
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from blockchain import Block, JSON_LEAF_VERSION
+from block_store import decode_block
+
+def make_block(transactions):
+    """Create a block of votes shaped like the ones the vote route records"""
+    election_id = str(uuid.uuid4())
+    candidate_ids = [str(uuid.uuid4()) for _ in range(4)]
+    votes = [
+        {
+            'sender': f'VOTER{i:08d}',
+            'recipient': 'ELECTION_SYSTEM',
+            'data': {
+                'type': 'vote',
+                'election_id': election_id,
+                'candidate': f'Candidate {"ABCD"[i % 4]}',
+                'candidate_id': candidate_ids[i % 4],
+                'voter_id': f'VOTER{i:08d}'
+            },
+            'timestamp': time.time(),
+            'transaction_id': str(uuid.uuid4())
+        }
+        for i in range(transactions)
+    ]
+    return Block(1, votes, time.time(), '0' * 64)
+
+def rate(function, runs, repeats=5):
+    """Calls per second of function, from the fastest of several timed batches"""
+    return runs / min(timeit.repeat(function, number=runs, repeat=repeats))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--transactions', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--runs', type=int, default=20, help='encodings timed per batch')
+    args = parser.parse_args()
+
+    print(f"📦 Serialization benchmark (best of 5 batches of {args.runs} runs; rates relative to JSON)")
+    print(f"{'txs':>6} {'json B':>10} {'binary B':>10} {'size':>7} "
+          f"{'encode':>8} {'decode':>8} {'leaves':>8}")
+    for transactions in args.transactions:
+        block = make_block(transactions)
+        as_json = json.dumps(block.to_dict(), sort_keys=True)
+        as_bytes = block.to_bytes()
+        assert decode_block(as_json).to_dict() == decode_block(as_bytes).to_dict()
+
+        encode = (rate(block.to_bytes, args.runs) /
+                  rate(lambda: json.dumps(block.to_dict(), sort_keys=True), args.runs))
+        decode = (rate(lambda: decode_block(as_bytes), args.runs) /
+                  rate(lambda: decode_block(as_json), args.runs))
+
+        # The same transactions hashed into JSON leaves, as version 2 blocks do
+        legacy = Block.from_bytes(as_bytes)
+        legacy.version = JSON_LEAF_VERSION
+        leaves = rate(block.leaf_hashes, args.runs) / rate(legacy.leaf_hashes, args.runs)
+
+        print(f"{transactions:>6} {len(as_json):>10} {len(as_bytes):>10} "
+              f"{len(as_bytes) / len(as_json):>6.0%} {encode:>7.2f}x {decode:>7.2f}x {leaves:>7.2f}x")
+
+if __name__ == "__main__":
+    main()
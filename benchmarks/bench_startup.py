@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmark for Blockchain Voting System
+This script reports the cold-start latency of importing app.py in a fresh interpreter
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SNIPPET = (
+    "import time; started = time.perf_counter(); import app; "
+    "print(time.perf_counter() - started)"
+)
+
+def import_seconds(env):
+    """Time one import of app.py in a new process"""
+    output = subprocess.run(
+        [sys.executable, '-c', IMPORT_SNIPPET],
+        cwd=PROJECT_ROOT, env=env, check=True, capture_output=True, text=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # A throwaway database and block store so the run starts cold
+        env = dict(os.environ,
+                   SECRET_KEY='bench',
+                   DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'voting_system.db')}",
+                   BLOCKCHAIN_STORE_PATH=os.path.join(tmp, 'blockchain.db'))
+        timings = [import_seconds(env) for _ in range(args.runs)]
+
+    print(f"🚀 import app over {args.runs} runs")
+    print(f"   Median: {statistics.median(timings) * 1000:.1f} ms")
+    print(f"   Min:    {min(timings) * 1000:.1f} ms")
+    print(f"   Max:    {max(timings) * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Benchmark Suite for Blockchain Voting System
+This script measures the blockchain core and the vote/results routes on
+synthetic elections and writes the results to a JSON file, so runs can be
+compared across commits
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Add the project root to Python path
+sys.path.append(PROJECT_ROOT)
+
+# Keep the run away from the real database and block store; app reads these at import
+BENCH_DIR = tempfile.mkdtemp(prefix='voting-bench-')
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(BENCH_DIR, 'voting_system.db')}"
+os.environ['BLOCKCHAIN_STORE_PATH'] = os.path.join(BENCH_DIR, 'blockchain.db')
+os.environ['BALLOT_JOURNAL_DIR'] = os.path.join(BENCH_DIR, 'ballots')
+
+from app import app, init_db, seal_pending_transactions, ballot_queue, blockchain as app_blockchain
+from blockchain import Block, Blockchain
+from bench_fixtures import CANDIDATES, create_election
+
+def summarize(samples):
+    """Median and tail of a list of durations in seconds, reported in milliseconds"""
+    ordered = sorted(samples)
+    return {
+        'count': len(ordered),
+        'p50_ms': round(statistics.median(ordered) * 1000, 3),
+        'p99_ms': round(ordered[min(len(ordered) - 1, int(0.99 * len(ordered)))] * 1000, 3),
+        'max_ms': round(ordered[-1] * 1000, 3)
+    }
+
+def bench_hashing(difficulty, blocks):
+    """Nonces tried per second by Block.mine_block"""
+    hashes = 0
+    start = time.perf_counter()
+    for index in range(blocks):
+        block = Block(index + 1, [], time.time(), uuid.uuid4().hex * 2)
+        block.mine_block(difficulty)
+        hashes += block.nonce + 1
+    elapsed = time.perf_counter() - start
+    return {'difficulty': difficulty, 'blocks': blocks, 'hashes_per_second': round(hashes / elapsed)}
+
+def synthetic_chain(votes, block_size):
+    """A chain holding one election with the given number of votes, as the vote route records them"""
+    blockchain = Blockchain()
+    # Proof-of-work is measured separately
+    blockchain.difficulty = 1
+    blockchain.max_block_transactions = block_size
+    election_id = str(uuid.uuid4())
+    candidate_ids = {name: str(uuid.uuid4()) for name in CANDIDATES}
+    for i in range(votes):
+        candidate = CANDIDATES[i % len(CANDIDATES)]
+        blockchain.add_transaction(f'VOTER{i:08d}', 'ELECTION_SYSTEM', {
+            'type': 'vote',
+            'election_id': election_id,
+            'candidate': candidate,
+            'candidate_id': candidate_ids[candidate],
+            'voter_id': f'VOTER{i:08d}'
+        }, transaction_id=str(uuid.uuid4()))
+    blockchain.mine_pending_transactions('BENCH_MINER')
+    return blockchain, election_id
+
+def bench_chain(votes, block_size):
+    """Build, validate and tally a synthetic election"""
+    start = time.perf_counter()
+    blockchain, election_id = synthetic_chain(votes, block_size)
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    assert blockchain.is_chain_valid(full=True)
+    validate = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = blockchain.get_election_results(election_id)
+    tally = time.perf_counter() - start
+    assert results['total_votes'] == votes
+
+    return {
+        'votes': votes,
+        'blocks': len(blockchain.chain),
+        'build_seconds': round(build, 4),
+        'is_chain_valid_seconds': round(validate, 4),
+        'get_election_results_seconds': round(tally, 4)
+    }
+
+def bench_vote_route(client, election_id, candidate_ids, voter_ids):
+    """POST one vote per voter through the Flask test client"""
+    latencies = []
+    start = time.perf_counter()
+    for i, voter_id in enumerate(voter_ids):
+        # Log in through the session rather than the password check of /login
+        with client.session_transaction() as session:
+            session['_user_id'] = voter_id
+            session['_fresh'] = True
+        request_start = time.perf_counter()
+        response = client.post(f'/vote/{election_id}', data={'candidate': candidate_ids[i % len(candidate_ids)]})
+        latencies.append(time.perf_counter() - request_start)
+        assert response.status_code == 302, response.status_code
+    elapsed = time.perf_counter() - start
+
+    result = summarize(latencies)
+    result['votes_per_second'] = round(len(voter_ids) / elapsed, 1)
+    return result
+
+def bench_results_route(client, election_id, requests):
+    """GET the results page; the first request after a new block computes the results"""
+    start = time.perf_counter()
+    assert client.get(f'/results/{election_id}').status_code == 200
+    cold = time.perf_counter() - start
+
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        assert client.get(f'/results/{election_id}').status_code == 200
+        latencies.append(time.perf_counter() - start)
+
+    result = summarize(latencies)
+    result['cold_ms'] = round(cold * 1000, 3)
+    return result
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=PROJECT_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--votes', type=int, nargs='+', default=[1000, 10000, 100000],
+                        help='election sizes for the blockchain benchmarks (up to 10^6)')
+    parser.add_argument('--block-size', type=int, default=1000)
+    parser.add_argument('--difficulty', type=int, default=4)
+    parser.add_argument('--hash-blocks', type=int, default=5, help='blocks mined to measure hashes/sec')
+    parser.add_argument('--http-votes', type=int, default=500, help='votes POSTed through /vote')
+    parser.add_argument('--results-requests', type=int, default=200)
+    parser.add_argument('--output', default=os.path.join(PROJECT_ROOT, 'benchmarks', 'results.json'))
+    args = parser.parse_args()
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': datetime.utcnow().isoformat() + 'Z',
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'benchmarks': {}
+    }
+    benchmarks = report['benchmarks']
+
+    print("📊 Blockchain Voting System benchmarks")
+    benchmarks['mine_block'] = bench_hashing(args.difficulty, args.hash_blocks)
+    print(f"   mine_block: {benchmarks['mine_block']['hashes_per_second']} hashes/s")
+
+    benchmarks['chain'] = []
+    for votes in args.votes:
+        result = bench_chain(votes, args.block_size)
+        benchmarks['chain'].append(result)
+        print(f"   {votes} votes: is_chain_valid {result['is_chain_valid_seconds']}s, "
+              f"get_election_results {result['get_election_results_seconds']}s")
+
+    app.config['WTF_CSRF_ENABLED'] = False
+    with app.app_context():
+        init_db()
+        election_id, candidate_ids, voter_ids = create_election(args.http_votes)
+        client = app.test_client()
+
+        benchmarks['vote_route'] = bench_vote_route(client, election_id, candidate_ids, voter_ids)
+        print(f"   POST /vote: {benchmarks['vote_route']['votes_per_second']} votes/s")
+
+        ballot_queue.flush()
+        app_blockchain.writable = True
+        app_blockchain.difficulty = 1
+        seal_pending_transactions('BENCH_MINER')
+        app_blockchain.writable = False
+
+        benchmarks['results_route'] = bench_results_route(client, election_id, args.results_requests)
+        print(f"   GET /results: p50 {benchmarks['results_route']['p50_ms']} ms, "
+              f"p99 {benchmarks['results_route']['p99_ms']} ms")
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    shutil.rmtree(BENCH_DIR, ignore_errors=True)
+    print(f"✅ Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+import json
+import os
+import sqlite3
+import threading
+from typing import List, Iterator, Optional, Tuple, Union
+
+from blockchain import Block
+
+def index_entries(block: Block) -> Iterator[Tuple[str, str, int, int]]:
+    """Secondary index rows (kind, key, block index, position) for a block"""
+    for position, transaction in enumerate(block.transactions):
+        yield 'transaction', transaction.transaction_id, block.index, position
+        addresses = {transaction.sender, transaction.recipient}
+        voter_id = transaction.data.get('voter_id')
+        if voter_id:
+            addresses.add(voter_id)
+        for address in addresses:
+            yield 'address', address, block.index, position
+
+def decode_block(data: Union[bytes, str]) -> Block:
+    """Rebuild a stored block; stores written before the binary format hold JSON text"""
+    if isinstance(data, str):
+        return Block.from_dict(json.loads(data))
+    return Block.from_bytes(data)
+
+class BlockStore:
+    """Append-only on-disk log of binary-encoded blocks backed by SQLite"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        # WAL lets readers proceed while a block is being written, and
+        # synchronous=FULL makes every committed block durable with one fsync
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=FULL')
+        # data holds Block.to_bytes(); rows written before that format hold
+        # JSON text, which SQLite keeps as TEXT alongside the BLOBs
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS blocks ('
+            'block_index INTEGER PRIMARY KEY, '
+            'hash TEXT NOT NULL, '
+            'data BLOB NOT NULL)'
+        )
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)'
+        )
+        # Transaction ids and addresses (sender, recipient, voter) mapped to
+        # where they occur on the chain, written with the blocks they index
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS transaction_index ('
+            'kind TEXT NOT NULL, '
+            'key TEXT NOT NULL, '
+            'block_index INTEGER NOT NULL, '
+            'position INTEGER NOT NULL, '
+            'PRIMARY KEY (kind, key, block_index, position)) WITHOUT ROWID'
+        )
+        self._conn.commit()
+
+    def append(self, block: Block) -> None:
+        """Write a block and its index rows, durable once this returns
+
+        Each block is committed, and fsynced, on its own: the database rows
+        that refer to a sealed block are committed right after it.
+        """
+        data = block.to_bytes()
+        entries = list(index_entries(block))
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT INTO blocks (block_index, hash, data) VALUES (?, ?, ?)',
+                (block.index, block.hash, data)
+            )
+            self._insert_index(entries)
+    
+    def _insert_index(self, entries: List[Tuple[str, str, int, int]]) -> None:
+        self._conn.executemany(
+            'INSERT OR IGNORE INTO transaction_index (kind, key, block_index, position) VALUES (?, ?, ?, ?)',
+            entries
+        )
+    
+    def backfill_index(self) -> None:
+        """Index the blocks of a store written before the secondary index existed
+
+        Run by init-db rather than on every open, since it decodes the whole
+        chain; the check is made under the write lock so concurrent callers
+        only index the chain once.
+        """
+        with self._lock, self._conn:
+            self._conn.execute('BEGIN IMMEDIATE')
+            if self._conn.execute("SELECT 1 FROM meta WHERE key = 'transaction_index'").fetchone():
+                return
+            for (data,) in self._conn.execute('SELECT data FROM blocks ORDER BY block_index').fetchall():
+                self._insert_index(list(index_entries(decode_block(data))))
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('transaction_index', '1')")
+    
+    def locate_transaction(self, transaction_id: str) -> Optional[Tuple[int, int]]:
+        """Block index and position of a transaction, if it has been written"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT block_index, position FROM transaction_index WHERE kind = 'transaction' AND key = ?",
+                (transaction_id,)
+            ).fetchone()
+    
+    def locate_address(self, address: str) -> List[Tuple[int, int]]:
+        """Block index and position of every transaction sent by, to or for an address"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT block_index, position FROM transaction_index WHERE kind = 'address' AND key = ? "
+                "ORDER BY block_index, position",
+                (address,)
+            ).fetchall()
+
+    def insert_genesis(self, block: Block) -> None:
+        """Write the genesis block unless another process already wrote one"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR IGNORE INTO blocks (block_index, hash, data) VALUES (?, ?, ?)',
+                (block.index, block.hash, block.to_bytes())
+            )
+
+    def load(self, start: int = 0) -> List[Block]:
+        """Load stored blocks from the given index onwards in chain order"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT data FROM blocks WHERE block_index >= ? ORDER BY block_index', (start,)
+            ).fetchall()
+        return [decode_block(data) for (data,) in rows]
+
+    def save_checkpoint(self, index: int, block_hash: str) -> None:
+        """Record the last block verified by chain validation"""
+        value = json.dumps({'index': index, 'hash': block_hash})
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('checkpoint', ?)", (value,)
+            )
+
+    def load_checkpoint(self) -> Optional[Tuple[int, str]]:
+        """Return the last verified (index, hash), if validation ever ran"""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'checkpoint'").fetchone()
+        if row is None:
+            return None
+        checkpoint = json.loads(row[0])
+        return checkpoint['index'], checkpoint['hash']
+
+    def count(self) -> int:
+        """Number of blocks written to disk"""
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM blocks').fetchone()[0]
+
+    def close(self) -> None:
+        """Close the underlying connection"""
+        self._conn.close()
@@ -1,113 +1,720 @@
 import hashlib
 import json
+import os
+import struct
+import sys
+import threading
 import time
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Iterator, Optional, Set, Tuple
 import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+from merkle import merkle_root, merkle_proof, leaf_hash, transaction_hash
+from consensus import ProofOfWork
+from codec import (read_bytes, read_double, read_str, read_value, read_varint,
+                   write_bytes, write_double, write_str, write_value, write_varint)
+
+# Block header layout: version, index, timestamp, previous hash, Merkle root.
+# The 8-byte nonce is appended last so mining only rehashes the nonce.
+HEADER_FORMAT = struct.Struct('>IQd32s32s')
+NONCE_FORMAT = struct.Struct('>Q')
+
+# Version 1 blocks hash the full JSON body; version 2 blocks hash a binary
+# header that commits to the transactions through a Merkle root of their
+# JSON; version 3 Merkle leaves hash the binary encoding from codec.py
+LEGACY_BLOCK_VERSION = 1
+JSON_LEAF_VERSION = 2
+BLOCK_VERSION = 3
+
+# The genesis block has no predecessor; its previous hash is stored as zeros
+GENESIS_PREVIOUS_HASH = '0'
+HASH_SIZE = 32
+ZERO_HASH = bytes(HASH_SIZE)
+
+# Every new chain starts from the same genesis header, and its proof-of-work
+# nonce is precomputed for the usual difficulties so it is never mined at startup
+GENESIS_TIMESTAMP = 0.0
+GENESIS_NONCES = {1: 1, 2: 140, 3: 2134, 4: 119786, 5: 251249}
+
+def _pack_hash(value: str) -> bytes:
+    """Store a hex hash as 32 raw bytes"""
+    return bytes.fromhex(value.rjust(64, '0'))
+
+def _unpack_hash(value: bytes) -> str:
+    """Render a stored hash back to hex"""
+    return GENESIS_PREVIOUS_HASH if value == ZERO_HASH else value.hex()
+
+def _intern_data(data: Dict) -> Dict:
+    """Share one copy of repeated keys and ids (election, candidate, type) across votes"""
+    return {
+        sys.intern(key): sys.intern(value) if isinstance(value, str) else value
+        for key, value in data.items()
+    }
+
+def _pack_transaction_id(transaction_id: str) -> Any:
+    """Keep canonical UUIDs as 16 bytes, anything else as given"""
+    try:
+        packed = uuid.UUID(transaction_id)
+    except ValueError:
+        return transaction_id
+    return packed.bytes if str(packed) == transaction_id else transaction_id
+
+class DuplicateVoteError(ValueError):
+    """Raised when a voter already has a vote sealed or pending in an election"""
+
+def _vote_key(transaction: 'Transaction') -> Optional[Tuple[str, str]]:
+    """(election id, voter id) of a vote transaction, None for anything else"""
+    data = transaction.data
+    if data.get('type') != 'vote':
+        return None
+    return data.get('election_id'), data.get('voter_id') or transaction.sender
+
+# In-memory index entries pack (block index, position) into a single int
+LOCATION_BITS = 32
+
+class Transaction:
+    """Compact transaction record; dict views are built only for API output"""
+    __slots__ = ('sender', 'recipient', 'data', 'timestamp', '_id')
+    
+    def __init__(self, sender: str, recipient: str, data: Dict, timestamp: float, transaction_id: str):
+        self.sender = sys.intern(sender)
+        self.recipient = sys.intern(recipient)
+        self.data = _intern_data(data)
+        self.timestamp = timestamp
+        self._id = _pack_transaction_id(transaction_id)
+    
+    @property
+    def transaction_id(self) -> str:
+        if isinstance(self._id, bytes):
+            return str(uuid.UUID(bytes=self._id))
+        return self._id
+    
+    def __getitem__(self, key: str) -> Any:
+        """Support the dict-style access used by callers of the old representation"""
+        if key not in TRANSACTION_FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        return self[key] if key in TRANSACTION_FIELDS else default
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Transaction':
+        return cls(data['sender'], data['recipient'], data['data'], data['timestamp'], data['transaction_id'])
+    
+    def to_bytes(self) -> bytes:
+        """Canonical binary encoding, hashed into the Merkle leaves of a block"""
+        out = bytearray()
+        write_str(out, self.sender)
+        write_str(out, self.recipient)
+        write_double(out, self.timestamp)
+        # UUID ids are written in their packed 16-byte form
+        write_value(out, self._id)
+        write_value(out, self.data)
+        return bytes(out)
+    
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'Transaction':
+        sender, offset = read_str(data, 0)
+        recipient, offset = read_str(data, offset)
+        timestamp, offset = read_double(data, offset)
+        transaction_id, offset = read_value(data, offset)
+        values, offset = read_value(data, offset)
+        if offset != len(data):
+            raise ValueError("Trailing bytes after transaction")
+        
+        transaction = cls.__new__(cls)
+        transaction.sender = sys.intern(sender)
+        transaction.recipient = sys.intern(recipient)
+        # Data keys and short string values come back interned by the decoder
+        transaction.data = values
+        transaction.timestamp = timestamp
+        transaction._id = transaction_id
+        return transaction
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert transaction to dictionary for JSON serialization"""
+        return {
+            'sender': self.sender,
+            'recipient': self.recipient,
+            'data': self.data,
+            'timestamp': self.timestamp,
+            'transaction_id': self.transaction_id
+        }
+
+TRANSACTION_FIELDS = frozenset(('sender', 'recipient', 'data', 'timestamp', 'transaction_id'))
 
 class Block:
-    def __init__(self, index: int, transactions: List[Dict], timestamp: float, previous_hash: str):
+    __slots__ = ('version', 'index', 'transactions', 'timestamp', 'nonce',
+                 '_previous_hash', '_merkle_root', '_hash', 'signature')
+    
+    def __init__(self, index: int, transactions: List, timestamp: float, previous_hash: str):
+        self.version = BLOCK_VERSION
         self.index = index
-        self.transactions = transactions
+        self.transactions = [
+            tx if isinstance(tx, Transaction) else Transaction.from_dict(tx) for tx in transactions
+        ]
         self.timestamp = timestamp
         self.previous_hash = previous_hash
         self.nonce = 0
+        self.merkle_root = self.calculate_merkle_root()
         self.hash = self.calculate_hash()
+        # Authority signature over the hash, for chains sealed by proof-of-authority
+        self.signature: Optional[bytes] = None
+    
+    # Hashes are held as raw bytes and only rendered as hex on access
+    @property
+    def hash(self) -> str:
+        return self._hash.hex()
+    
+    @hash.setter
+    def hash(self, value: str) -> None:
+        self._hash = _pack_hash(value)
+    
+    @property
+    def previous_hash(self) -> str:
+        return _unpack_hash(self._previous_hash)
+    
+    @previous_hash.setter
+    def previous_hash(self, value: str) -> None:
+        self._previous_hash = _pack_hash(value)
+    
+    @property
+    def merkle_root(self) -> Optional[str]:
+        return self._merkle_root.hex() if self._merkle_root is not None else None
+    
+    @merkle_root.setter
+    def merkle_root(self, value: Optional[str]) -> None:
+        self._merkle_root = bytes.fromhex(value) if value is not None else None
+    
+    def leaf_hashes(self) -> List[bytes]:
+        """Merkle leaves of the block's transactions, hashed as its version defines"""
+        if self.version <= JSON_LEAF_VERSION:
+            return [transaction_hash(tx.to_dict()) for tx in self.transactions]
+        return [leaf_hash(tx.to_bytes()) for tx in self.transactions]
+    
+    def calculate_merkle_root(self) -> str:
+        """Calculate the Merkle root of the block's transactions"""
+        return merkle_root(self.leaf_hashes()).hex()
+    
+    def header_prefix(self, merkle_root_hex: str) -> bytes:
+        """Serialize the fixed part of the header that precedes the nonce"""
+        return HEADER_FORMAT.pack(
+            self.version,
+            self.index,
+            self.timestamp,
+            self._previous_hash,
+            bytes.fromhex(merkle_root_hex)
+        )
+    
+    def header_midstate(self, merkle_root_hex: str) -> Any:
+        """Hash the fixed part of the header, ready to be cloned per nonce"""
+        return hashlib.sha256(self.header_prefix(merkle_root_hex))
     
     def calculate_hash(self) -> str:
         """Calculate the hash of the block"""
-        block_string = json.dumps({
-            'index': self.index,
-            'transactions': self.transactions,
-            'timestamp': self.timestamp,
-            'previous_hash': self.previous_hash,
-            'nonce': self.nonce
-        }, sort_keys=True)
-        return hashlib.sha256(block_string.encode()).hexdigest()
+        if self.version == LEGACY_BLOCK_VERSION:
+            block_string = json.dumps({
+                'index': self.index,
+                'transactions': [tx.to_dict() for tx in self.transactions],
+                'timestamp': self.timestamp,
+                'previous_hash': self.previous_hash,
+                'nonce': self.nonce
+            }, sort_keys=True)
+            return hashlib.sha256(block_string.encode()).hexdigest()
+        
+        # Recompute the Merkle root so tampered transactions change the hash
+        sha = self.header_midstate(self.calculate_merkle_root())
+        sha.update(NONCE_FORMAT.pack(self.nonce))
+        return sha.hexdigest()
     
-    def mine_block(self, difficulty: int) -> None:
+    def mine_block(self, difficulty: int, miner=None) -> None:
         """Mine the block with the specified difficulty"""
         target = '0' * difficulty
-        while self.hash[:difficulty] != target:
-            self.nonce += 1
-            self.hash = self.calculate_hash()
+        if self.version == LEGACY_BLOCK_VERSION:
+            while self.hash[:difficulty] != target:
+                self.nonce += 1
+                self.hash = self.calculate_hash()
+            return
+        
+        if self.hash.startswith(target):
+            return
+        
+        # Hand the nonce search to a parallel miner when one is configured
+        if miner is not None:
+            self.nonce, self.hash = miner.search(self.header_prefix(self.merkle_root), difficulty, self.nonce + 1)
+            return
+        
+        # Only the nonce changes between attempts, so clone the header midstate
+        # instead of re-serializing the transactions for every nonce
+        midstate = self.header_midstate(self.merkle_root)
+        nonce = self.nonce
+        block_hash = self.hash
+        while not block_hash.startswith(target):
+            nonce += 1
+            sha = midstate.copy()
+            sha.update(NONCE_FORMAT.pack(nonce))
+            block_hash = sha.hexdigest()
+        self.nonce = nonce
+        self.hash = block_hash
+    
+    def transaction_proof(self, position: int) -> Optional[Dict[str, Any]]:
+        """Build a Merkle inclusion proof for the transaction at a position"""
+        if self.version == LEGACY_BLOCK_VERSION:
+            return None
+        
+        leaves = self.leaf_hashes()
+        return {
+            'transaction_id': self.transactions[position].transaction_id,
+            'transaction_hash': leaves[position].hex(),
+            'proof': merkle_proof(leaves, position),
+            'merkle_root': self.merkle_root,
+            'block': {
+                'version': self.version,
+                'index': self.index,
+                'timestamp': self.timestamp,
+                'previous_hash': self.previous_hash,
+                'nonce': self.nonce,
+                'hash': self.hash
+            }
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Block':
+        """Rebuild a stored block without recomputing its hash"""
+        block = cls.__new__(cls)
+        block.version = data.get('version', LEGACY_BLOCK_VERSION)
+        block.index = data['index']
+        block.transactions = [Transaction.from_dict(tx) for tx in data['transactions']]
+        block.timestamp = data['timestamp']
+        block.previous_hash = data['previous_hash']
+        block.nonce = data['nonce']
+        block.merkle_root = data.get('merkle_root')
+        block.hash = data['hash']
+        block.signature = bytes.fromhex(data['signature']) if data.get('signature') else None
+        return block
+    
+    def to_bytes(self) -> bytes:
+        """Binary encoding used by the block store and audit workers"""
+        out = bytearray()
+        write_varint(out, self.version)
+        write_varint(out, self.index)
+        write_double(out, self.timestamp)
+        out += self._previous_hash
+        # Legacy blocks have no Merkle root and unsealed ones no signature
+        write_bytes(out, self._merkle_root or b'')
+        write_varint(out, self.nonce)
+        out += self._hash
+        write_bytes(out, self.signature or b'')
+        write_varint(out, len(self.transactions))
+        for tx in self.transactions:
+            write_bytes(out, tx.to_bytes())
+        return bytes(out)
+    
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'Block':
+        """Rebuild a block from its binary encoding without recomputing its hash"""
+        block = cls.__new__(cls)
+        try:
+            block.version, offset = read_varint(data, 0)
+            block.index, offset = read_varint(data, offset)
+            block.timestamp, offset = read_double(data, offset)
+            block._previous_hash, offset = data[offset:offset + HASH_SIZE], offset + HASH_SIZE
+            merkle_root_bytes, offset = read_bytes(data, offset)
+            block.nonce, offset = read_varint(data, offset)
+            block._hash, offset = data[offset:offset + HASH_SIZE], offset + HASH_SIZE
+            signature, offset = read_bytes(data, offset)
+            count, offset = read_varint(data, offset)
+            block.transactions = []
+            for _ in range(count):
+                transaction, offset = read_bytes(data, offset)
+                block.transactions.append(Transaction.from_bytes(transaction))
+        except (IndexError, struct.error):
+            raise ValueError("Truncated block encoding") from None
+        if offset != len(data):
+            raise ValueError(f"Trailing bytes after block {block.index}")
+        block._merkle_root = merkle_root_bytes or None
+        block.signature = signature or None
+        return block
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert block to dictionary for JSON serialization"""
-        return {
+        data = {
             'index': self.index,
-            'transactions': self.transactions,
+            'transactions': [tx.to_dict() for tx in self.transactions],
             'timestamp': self.timestamp,
             'previous_hash': self.previous_hash,
             'nonce': self.nonce,
             'hash': self.hash
         }
+        if self.version != LEGACY_BLOCK_VERSION:
+            data['version'] = self.version
+            data['merkle_root'] = self.merkle_root
+        if self.signature is not None:
+            data['signature'] = self.signature.hex()
+        return data
+
+def find_invalid_block(blocks: List[bytes], previous_hash: str, consensus=None) -> Optional[int]:
+    """Return the index of the first invalid block in a run of encoded blocks"""
+    linked = []
+    broken_link = None
+    for data in blocks:
+        block = Block.from_bytes(data)
+        if block.hash != block.calculate_hash() or block.previous_hash != previous_hash:
+            broken_link = block.index
+            break
+        linked.append(block)
+        previous_hash = block.hash
+    
+    # Seals are checked as one batch over the blocks that link correctly
+    bad_seal = consensus.find_invalid_seal(linked) if consensus is not None else None
+    return bad_seal if bad_seal is not None else broken_link
+
+def _unpack_location(location: int) -> Tuple[int, int]:
+    return location >> LOCATION_BITS, location & ((1 << LOCATION_BITS) - 1)
 
 class Blockchain:
-    def __init__(self):
-        self.chain: List[Block] = []
+    def __init__(self, store=None, verify_tail: int = 16, writable: bool = True, consensus=None):
+        # A stored chain is only read on first access (see the chain property)
+        self._chain: Optional[List[Block]] = None
+        self.store = store
+        self.verify_tail = verify_tail
+        # Only the single writer process may append blocks to a shared store
+        self.writable = writable
+        self._lock = threading.RLock()
         self.difficulty = 4
-        self.pending_transactions: List[Dict] = []
+        self.pending_transactions: List[Transaction] = []
         self.mining_reward = 10
+        # Bounds on a single block; a larger pending pool is split across blocks
+        self.max_block_transactions = 1000
+        self.max_block_bytes = 1 << 20
+        # Optional parallel nonce search (see mining.ParallelMiner)
+        self.miner = None
+        # How blocks are sealed and their seals verified (see consensus.py)
+        self.consensus = consensus or ProofOfWork()
+        # Callbacks run for every block added to this process's view of the chain
+        self.listeners: List[Callable[[Block], None]] = []
         
-        # Create the genesis block
-        self.create_genesis_block()
+        # Per-election tally index, kept in step with the chain on every append
+        self.vote_tallies: Dict[str, Dict[str, int]] = {}
+        self.election_votes: Dict[str, List[Tuple[int, Transaction]]] = {}
+        # Transaction id and address lookups for a chain without a store; a
+        # stored chain keeps these indexes on disk next to its blocks
+        self.transaction_locations: Dict[Any, int] = {}
+        self.address_locations: Dict[str, Any] = {}
+        # Voters with a sealed vote per election, and (election, voter) pairs
+        # waiting in the pending pool; both hold the interned voter id strings
+        self.election_voters: Dict[str, Set[str]] = {}
+        self._pending_votes: Set[Tuple[str, str]] = set()
+        # Pending votes dropped at sealing because the voter had already voted
+        self.rejected_transactions: List[Transaction] = []
+        
+        # Validation cursor: every block up to this one has already been verified
+        self.verified_index = 0
+        self.verified_hash: Optional[str] = None
+        
+        # Without a store the chain lives in memory and starts at the genesis block
+        if store is None:
+            self._chain = []
+            self.create_genesis_block()
+            self.verified_hash = self._chain[0].hash
+    
+    @property
+    def chain(self) -> List[Block]:
+        """Blocks of the chain, read from the store on first access"""
+        self._ensure_loaded()
+        return self._chain
+    
+    def _ensure_loaded(self) -> None:
+        """Load a stored chain before reading it or the indexes built from it"""
+        if self._chain is None:
+            self._load()
+    
+    @chain.setter
+    def chain(self, blocks: List[Block]) -> None:
+        self._chain = blocks
+    
+    def _load(self) -> None:
+        """Reload the chain from disk, writing the genesis block for a new store"""
+        with self._lock:
+            if self._chain is not None:
+                return
+            if not self.store.count():
+                # Every process sharing the store must agree on one genesis block
+                self.store.insert_genesis(self.mine_genesis_block())
+            self.load_from_store(self.verify_tail)
+            
+            self.verified_index = 0
+            self.verified_hash = self._chain[0].hash
+            checkpoint = self.store.load_checkpoint()
+            if checkpoint:
+                self.verified_index, self.verified_hash = checkpoint
+    
+    def mine_genesis_block(self) -> Block:
+        """Build the first block of a new chain, identical in every process"""
+        genesis_block = Block(0, [], GENESIS_TIMESTAMP, GENESIS_PREVIOUS_HASH)
+        nonce = GENESIS_NONCES.get(self.difficulty)
+        if nonce is not None:
+            # Proof-of-work sealing returns at once for a hash that already meets the difficulty
+            genesis_block.nonce = nonce
+            genesis_block.hash = genesis_block.calculate_hash()
+        self.consensus.seal(genesis_block, self)
+        return genesis_block
     
     def create_genesis_block(self) -> None:
         """Create the first block in the chain"""
-        genesis_block = Block(0, [], time.time(), "0")
-        genesis_block.mine_block(self.difficulty)
-        self.chain.append(genesis_block)
+        self.append_block(self.mine_genesis_block())
+    
+    def load_from_store(self, verify_tail: int) -> None:
+        """Load the persisted chain, re-verifying only the most recent blocks"""
+        chain = self.store.load()
+        
+        tail_start = max(1, len(chain) - verify_tail)
+        for i in range(tail_start, len(chain)):
+            self._verify_stored_block(chain[i], chain[i - 1])
+        self._verify_stored_seals(chain[tail_start:])
+        
+        self.chain = chain
+        self.rebuild_tally_index()
+    
+    def _verify_stored_block(self, block: Block, previous_block: Block) -> None:
+        """Reject a stored block that does not extend the given previous block"""
+        if (block.index != previous_block.index + 1 or
+                block.hash != block.calculate_hash() or
+                block.previous_hash != previous_block.hash):
+            raise ValueError(f"Stored blockchain failed verification at block {block.index}")
+    
+    def _verify_stored_seals(self, blocks: List[Block]) -> None:
+        """Reject stored blocks that were not sealed under this chain's consensus"""
+        bad_seal = self.consensus.find_invalid_seal(blocks)
+        if bad_seal is not None:
+            raise ValueError(f"Stored blockchain failed verification at block {bad_seal}")
+    
+    def refresh(self) -> int:
+        """Pick up blocks appended to the shared store by the writer process"""
+        if self.store is None:
+            return 0
+        
+        with self._lock:
+            new_blocks = self.store.load(len(self.chain))
+            self._verify_stored_seals(new_blocks)
+            for block in new_blocks:
+                self._verify_stored_block(block, self.chain[-1])
+                self.chain.append(block)
+                self._index_block(block)
+                self._notify_listeners(block)
+            return len(new_blocks)
+    
+    def append_block(self, block: Block) -> None:
+        """Append a block to the chain and update the tally index"""
+        if not self.writable:
+            raise RuntimeError("This process only has a read-only view of the blockchain")
+        with self._lock:
+            # Written to the store first, so a failed write leaves the chain unchanged
+            if self.store is not None:
+                self.store.append(block)
+            self.chain.append(block)
+            self._index_block(block)
+            self._notify_listeners(block)
+    
+    def add_listener(self, callback: Callable[[Block], None]) -> None:
+        """Register a callback for blocks appended or picked up from the store"""
+        self.listeners.append(callback)
+    
+    def _notify_listeners(self, block: Block) -> None:
+        for callback in self.listeners:
+            callback(block)
+    
+    def _index_block(self, block: Block) -> None:
+        """Fold the votes of a single block into the tally index"""
+        for position, transaction in enumerate(block.transactions):
+            data = transaction.data
+            if self.store is None:
+                self._index_location(transaction, block.index << LOCATION_BITS | position)
+            if data.get('type') != 'vote':
+                continue
+            election_id = data.get('election_id')
+            self.election_voters.setdefault(election_id, set()).add(data.get('voter_id') or transaction.sender)
+            # Keep a reference to the transaction; result dicts are built on demand
+            self.election_votes.setdefault(election_id, []).append((block.index, transaction))
+            candidate = data.get('candidate')
+            if candidate:
+                counts = self.vote_tallies.setdefault(election_id, {})
+                counts[candidate] = counts.get(candidate, 0) + 1
+    
+    def _index_location(self, transaction: Transaction, location: int) -> None:
+        """Record where a transaction and the addresses it involves occur"""
+        # Keys reuse the transaction's own id and interned address strings
+        self.transaction_locations[transaction._id] = location
+        for address in {transaction.sender, transaction.recipient, transaction.data.get('voter_id')}:
+            if not address:
+                continue
+            # Most voters appear once, so a lone location is stored without a list
+            existing = self.address_locations.get(address)
+            if existing is None:
+                self.address_locations[address] = location
+            elif isinstance(existing, int):
+                self.address_locations[address] = [existing, location]
+            else:
+                existing.append(location)
+    
+    def rebuild_tally_index(self) -> None:
+        """Rebuild the tally index from scratch by scanning the whole chain"""
+        self.vote_tallies = {}
+        self.election_votes = {}
+        self.transaction_locations = {}
+        self.address_locations = {}
+        self.election_voters = {}
+        for block in self.chain:
+            self._index_block(block)
+    
+    def _resolve(self, location: Optional[Tuple[int, int]]) -> Optional[Tuple[Block, int]]:
+        """Turn an index entry into its block, catching up with the store if needed"""
+        if location is None:
+            return None
+        block_index, position = location
+        if block_index >= len(self.chain):
+            self.refresh()
+        if block_index >= len(self.chain):
+            return None
+        return self.chain[block_index], position
+    
+    def locate_transaction(self, transaction_id: str) -> Optional[Tuple[Block, int]]:
+        """Find the block and position of a sealed transaction without scanning the chain"""
+        if self.store is not None:
+            return self._resolve(self.store.locate_transaction(transaction_id))
+        location = self.transaction_locations.get(_pack_transaction_id(transaction_id))
+        return self._resolve(_unpack_location(location) if location is not None else None)
+    
+    def get_address_transactions(self, address: str) -> List[Tuple[int, Transaction]]:
+        """Every sealed transaction sent by, to or on behalf of an address, in chain order"""
+        if self.store is not None:
+            locations = self.store.locate_address(address)
+        else:
+            locations = self.address_locations.get(address, [])
+            if isinstance(locations, int):
+                locations = [locations]
+            locations = [_unpack_location(location) for location in locations]
+        
+        transactions = []
+        for location in locations:
+            resolved = self._resolve(location)
+            if resolved is not None:
+                block, position = resolved
+                transactions.append((block.index, block.transactions[position]))
+        return transactions
     
     def get_latest_block(self) -> Block:
         """Get the most recent block in the chain"""
         return self.chain[-1]
     
-    def add_transaction(self, sender: str, recipient: str, data: Dict) -> int:
+    def add_transaction(self, sender: str, recipient: str, data: Dict,
+                        transaction_id: Optional[str] = None, timestamp: Optional[float] = None) -> int:
         """Add a new transaction to pending transactions"""
-        transaction = {
-            'sender': sender,
-            'recipient': recipient,
-            'data': data,
-            'timestamp': time.time(),
-            'transaction_id': str(uuid.uuid4())
-        }
+        transaction = Transaction(
+            sender,
+            recipient,
+            data,
+            timestamp if timestamp is not None else time.time(),
+            transaction_id or str(uuid.uuid4())
+        )
+        vote_key = _vote_key(transaction)
+        if vote_key is not None:
+            if vote_key in self._pending_votes or self.has_voted(*vote_key):
+                raise DuplicateVoteError(f"Voter {vote_key[1]} has already voted in election {vote_key[0]}")
+            self._pending_votes.add(vote_key)
         self.pending_transactions.append(transaction)
         return self.get_latest_block().index + 1
     
-    def mine_pending_transactions(self, miner_address: str) -> None:
-        """Mine all pending transactions and add them to the blockchain"""
-        if not self.pending_transactions:
-            return
-        
-        # Create a new block with all pending transactions
-        block = Block(
-            len(self.chain),
-            self.pending_transactions,
-            time.time(),
-            self.get_latest_block().hash
-        )
-        
-        # Mine the block
-        block.mine_block(self.difficulty)
-        
-        # Add the block to the chain
-        self.chain.append(block)
+    def has_voted(self, election_id: str, voter_id: str) -> bool:
+        """Whether a vote by this voter is already sealed in the election"""
+        self._ensure_loaded()
+        return voter_id in self.election_voters.get(election_id, ())
+    
+    def _drop_duplicate_votes(self, transactions: List[Transaction]) -> List[Transaction]:
+        """Check the pool again at sealing, catching votes that bypassed add_transaction"""
+        admitted = []
+        seen = set()
+        for transaction in transactions:
+            vote_key = _vote_key(transaction)
+            if vote_key is not None:
+                if vote_key in seen or self.has_voted(*vote_key):
+                    self.rejected_transactions.append(transaction)
+                    continue
+                seen.add(vote_key)
+            admitted.append(transaction)
+        return admitted
+    
+    def _split_pending(self) -> List[List[Transaction]]:
+        """Cut the pending transactions into batches within the block size limits"""
+        batches: List[List[Transaction]] = []
+        batch: List[Transaction] = []
+        batch_bytes = 0
+        for transaction in self.pending_transactions:
+            size = len(transaction.to_bytes()) if self.max_block_bytes else 0
+            # A single oversized transaction still gets a block of its own
+            if batch and (len(batch) >= self.max_block_transactions or
+                          (self.max_block_bytes and batch_bytes + size > self.max_block_bytes)):
+                batches.append(batch)
+                batch, batch_bytes = [], 0
+            batch.append(transaction)
+            batch_bytes += size
+        if batch:
+            batches.append(batch)
+        return batches
+    
+    def mine_pending_blocks(self, miner_address: str) -> Iterator[Block]:
+        """Mine the pending transactions into bounded blocks, yielding each once it is durable
         
-        # Reset pending transactions and add mining reward
-        self.pending_transactions = [
-            {
-                'sender': "BLOCKCHAIN_REWARD",
-                'recipient': miner_address,
-                'data': {'type': 'mining_reward', 'amount': self.mining_reward},
-                'timestamp': time.time(),
-                'transaction_id': str(uuid.uuid4())
-            }
-        ]
+        The reward for every block is queued as a pending transaction for a later block.
+        """
+        self.pending_transactions = self._drop_duplicate_votes(self.pending_transactions)
+        self._pending_votes = set()
+        batches = self._split_pending()
+        self.pending_transactions = []
+        try:
+            for batch in batches:
+                block = Block(
+                    len(self.chain),
+                    batch,
+                    time.time(),
+                    self.get_latest_block().hash
+                )
+                self.consensus.seal(block, self)
+                self.append_block(block)
+                
+                self.pending_transactions.append(Transaction(
+                    "BLOCKCHAIN_REWARD",
+                    miner_address,
+                    {'type': 'mining_reward', 'amount': self.mining_reward},
+                    time.time(),
+                    str(uuid.uuid4())
+                ))
+                yield block
+        finally:
+            # Batches left unmined (e.g. after an error) stay pending
+            mined = len(self.pending_transactions)
+            for batch in batches[mined:]:
+                self.pending_transactions.extend(batch)
+                self._pending_votes.update(key for key in map(_vote_key, batch) if key is not None)
     
-    def is_chain_valid(self) -> bool:
-        """Verify the integrity of the blockchain"""
-        for i in range(1, len(self.chain)):
+    def mine_pending_transactions(self, miner_address: str) -> List[Block]:
+        """Mine all pending transactions into as many blocks as the size limits require"""
+        return list(self.mine_pending_blocks(miner_address))
+    
+    def get_transaction_proof(self, transaction_id: str) -> Optional[Dict[str, Any]]:
+        """Find a transaction on the chain and build its inclusion proof"""
+        located = self.locate_transaction(transaction_id)
+        if located is None:
+            return None
+        block, position = located
+        return block.transaction_proof(position)
+    
+    def is_chain_valid(self, full: bool = False) -> bool:
+        """Verify the integrity of the blockchain, resuming after the last verified block"""
+        start = 1 if full else self._resume_index()
+        for i in range(start, len(self.chain)):
             current_block = self.chain[i]
             previous_block = self.chain[i - 1]
             
@@ -119,68 +726,100 @@ class Blockchain:
             if current_block.previous_hash != previous_block.hash:
                 return False
         
+        # Check the seals of every newly verified block in one batch
+        if self.consensus.find_invalid_seal(self.chain[start:]) is not None:
+            return False
+        
+        self._save_checkpoint(len(self.chain) - 1)
         return True
     
+    def audit_chain(self, workers: Optional[int] = None) -> bool:
+        """Re-verify every block from genesis, splitting the chain across processes"""
+        chain = list(self.chain)
+        workers = workers or os.cpu_count() or 1
+        chunk_size = max(1, -(-(len(chain) - 1) // workers))
+        
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(find_invalid_block,
+                                [block.to_bytes() for block in chain[start:start + chunk_size]],
+                                chain[start - 1].hash,
+                                self.consensus)
+                for start in range(1, len(chain), chunk_size)
+            ]
+            is_valid = all(future.result() is None for future in futures)
+        
+        if is_valid:
+            self._save_checkpoint(len(chain) - 1)
+        return is_valid
+    
+    def _resume_index(self) -> int:
+        """First block that still needs verifying, or 1 if the checkpoint is stale"""
+        chain = self.chain
+        if (self.verified_index < len(chain) and
+                chain[self.verified_index].hash == self.verified_hash):
+            return self.verified_index + 1
+        return 1
+    
+    def _save_checkpoint(self, index: int) -> None:
+        """Advance the validation cursor and persist it with the chain"""
+        self.verified_index = index
+        self.verified_hash = self.chain[index].hash
+        if self.store is not None:
+            self.store.save_checkpoint(index, self.verified_hash)
+    
     def get_balance(self, address: str) -> int:
         """Calculate the balance of a given address"""
         balance = 0
         
-        for block in self.chain:
-            for transaction in block.transactions:
-                if transaction['recipient'] == address:
-                    balance += transaction['data'].get('amount', 0)
-                if transaction['sender'] == address and transaction['sender'] != "BLOCKCHAIN_REWARD":
-                    balance -= transaction['data'].get('amount', 0)
+        for _, transaction in self.get_address_transactions(address):
+            if transaction.recipient == address:
+                balance += transaction.data.get('amount', 0)
+            if transaction.sender == address and transaction.sender != "BLOCKCHAIN_REWARD":
+                balance -= transaction.data.get('amount', 0)
         
         return balance
     
     def get_vote_count(self, election_id: str) -> Dict[str, int]:
         """Count votes for a specific election"""
-        vote_counts = {}
-        
-        for block in self.chain:
-            for transaction in block.transactions:
-                if (transaction['data'].get('type') == 'vote' and 
-                    transaction['data'].get('election_id') == election_id):
-                    candidate = transaction['data'].get('candidate')
-                    if candidate:
-                        vote_counts[candidate] = vote_counts.get(candidate, 0) + 1
-        
-        return vote_counts
+        self._ensure_loaded()
+        return dict(self.vote_tallies.get(election_id, {}))
+    
+    def get_vote_total(self, election_id: str) -> int:
+        """Number of sealed votes in a specific election"""
+        self._ensure_loaded()
+        return len(self.election_votes.get(election_id, ()))
     
     def get_election_results(self, election_id: str) -> Dict[str, Any]:
         """Get detailed results for a specific election"""
-        votes = []
-        vote_counts = {}
-        
-        for block in self.chain:
-            for transaction in block.transactions:
-                if (transaction['data'].get('type') == 'vote' and 
-                    transaction['data'].get('election_id') == election_id):
-                    vote_data = transaction['data']
-                    votes.append({
-                        'voter_id': transaction['sender'],
-                        'candidate': vote_data.get('candidate'),
-                        'timestamp': transaction['timestamp'],
-                        'block_index': block.index
-                    })
-                    
-                    candidate = vote_data.get('candidate')
-                    if candidate:
-                        vote_counts[candidate] = vote_counts.get(candidate, 0) + 1
-        
+        self._ensure_loaded()
+        votes = self.election_votes.get(election_id, [])
         return {
             'election_id': election_id,
             'total_votes': len(votes),
-            'vote_counts': vote_counts,
-            'votes': votes
+            'vote_counts': self.get_vote_count(election_id),
+            'votes': [
+                {
+                    'voter_id': transaction.sender,
+                    'candidate': transaction.data.get('candidate'),
+                    'timestamp': transaction.timestamp,
+                    'block_index': block_index
+                }
+                for block_index, transaction in votes
+            ]
         }
     
+    def iter_blocks(self, start: int = 0, limit: Optional[int] = None) -> Iterator[Block]:
+        """Yield blocks in chain order without copying the chain"""
+        stop = len(self.chain) if limit is None else min(len(self.chain), start + limit)
+        for index in range(max(start, 0), stop):
+            yield self.chain[index]
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert blockchain to dictionary for JSON serialization"""
         return {
             'chain': [block.to_dict() for block in self.chain],
-            'pending_transactions': self.pending_transactions,
+            'pending_transactions': [tx.to_dict() for tx in self.pending_transactions],
             'difficulty': self.difficulty,
             'mining_reward': self.mining_reward
         } 
\ No newline at end of file
@@ -0,0 +1,49 @@
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, Optional
+
+class InclusionMetrics:
+    """Vote throughput and time-to-inclusion over a sliding window of sealed blocks
+
+    Follows the chain as a listener, so any process that keeps its chain up
+    to date (the miner, or a web worker via refresh) can report the metrics.
+    """
+
+    def __init__(self, blockchain, window: float = 60.0, max_samples: int = 10000):
+        self.window = window
+        self._samples = deque(maxlen=max_samples)
+        self._lock = threading.Lock()
+        # Only blocks appended from now on are sampled, so the chain is not loaded here
+        blockchain.add_listener(self.record_block)
+
+    def record_block(self, block) -> None:
+        """Record how long each vote in a newly appended block waited to be sealed"""
+        samples = [
+            (block.timestamp, max(0.0, block.timestamp - transaction.timestamp))
+            for transaction in block.transactions
+            if transaction.data.get('type') == 'vote'
+        ]
+        if samples:
+            with self._lock:
+                self._samples.extend(samples)
+
+    def snapshot(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """Summarize the votes sealed during the last window seconds"""
+        now = time.time() if now is None else now
+        since = now - self.window
+        with self._lock:
+            latencies = sorted(latency for sealed_at, latency in self._samples if sealed_at >= since)
+
+        def percentile(fraction: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(fraction * len(latencies)))], 3)
+
+        return {
+            'window_seconds': self.window,
+            'votes_sealed': len(latencies),
+            'votes_per_second': round(len(latencies) / self.window, 3),
+            'inclusion_latency_p50': percentile(0.50),
+            'inclusion_latency_p99': percentile(0.99)
+        }
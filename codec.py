@@ -0,0 +1,167 @@
+import struct
+from sys import intern
+from typing import Any, Tuple
+
+# Deterministic binary encoding used to hash and store blocks. Integers are
+# unsigned LEB128 varints (zigzag for signed values), strings and byte
+# strings are length-prefixed, floats are 8-byte big-endian IEEE 754 doubles
+# so a timestamp always encodes to the same bytes, and dict entries are
+# written in key order (code point order, which UTF-8 preserves).
+#
+# Encoders append to a bytearray; decoders take the data and an offset and
+# return the value with the offset just past it. Short reads are not checked
+# field by field, so callers compare the final offset with the data length.
+DOUBLE_FORMAT = struct.Struct('>d')
+
+# Type tags for the values held in transaction data
+NONE_TAG = 0
+FALSE_TAG = 1
+TRUE_TAG = 2
+INT_TAG = 3
+FLOAT_TAG = 4
+STR_TAG = 5
+BYTES_TAG = 6
+LIST_TAG = 7
+DICT_TAG = 8
+
+def write_varint(out: bytearray, value: int) -> None:
+    """Append a non-negative integer in 7-bit groups, low group first"""
+    if value < 0:
+        raise ValueError("Varints encode non-negative integers only")
+    while value >= 0x80:
+        out.append(value & 0x7f | 0x80)
+        value >>= 7
+    out.append(value)
+
+def write_bytes(out: bytearray, value: bytes) -> None:
+    """Append a length-prefixed byte string"""
+    size = len(value)
+    if size < 0x80:
+        out.append(size)
+    else:
+        write_varint(out, size)
+    out += value
+
+def write_str(out: bytearray, value: str) -> None:
+    write_bytes(out, value.encode())
+
+def write_double(out: bytearray, value: float) -> None:
+    out += DOUBLE_FORMAT.pack(value)
+
+def write_value(out: bytearray, value: Any) -> None:
+    """Append a tagged JSON-like value (None, bool, int, float, str, bytes, list, dict)"""
+    # Exact type checks: bool subclasses int, and strings are by far the most common
+    kind = type(value)
+    if kind is str:
+        out.append(STR_TAG)
+        write_bytes(out, value.encode())
+    elif kind is dict:
+        out.append(DICT_TAG)
+        write_varint(out, len(value))
+        for key in sorted(value):
+            write_bytes(out, key.encode())
+            write_value(out, value[key])
+    elif kind is int:
+        out.append(INT_TAG)
+        write_varint(out, value << 1 if value >= 0 else (-value << 1) - 1)
+    elif value is None:
+        out.append(NONE_TAG)
+    elif kind is bool:
+        out.append(TRUE_TAG if value else FALSE_TAG)
+    elif kind is float:
+        out.append(FLOAT_TAG)
+        out += DOUBLE_FORMAT.pack(value)
+    elif kind is bytes:
+        out.append(BYTES_TAG)
+        write_bytes(out, value)
+    elif kind is list or kind is tuple:
+        out.append(LIST_TAG)
+        write_varint(out, len(value))
+        for item in value:
+            write_value(out, item)
+    else:
+        raise TypeError(f"Cannot encode value of type {kind.__name__}")
+
+def encode_value(value: Any) -> bytes:
+    out = bytearray()
+    write_value(out, value)
+    return bytes(out)
+
+def read_varint(data: bytes, offset: int) -> Tuple[int, int]:
+    value = 0
+    shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+def read_bytes(data: bytes, offset: int) -> Tuple[bytes, int]:
+    size = data[offset]
+    if size < 0x80:
+        offset += 1
+    else:
+        size, offset = read_varint(data, offset)
+    end = offset + size
+    if end > len(data):
+        raise ValueError("Truncated field")
+    return data[offset:end], end
+
+def read_str(data: bytes, offset: int) -> Tuple[str, int]:
+    size = data[offset]
+    if size < 0x80:
+        end = offset + 1 + size
+        return data[offset + 1:end].decode(), end
+    value, offset = read_bytes(data, offset)
+    return value.decode(), offset
+
+def read_double(data: bytes, offset: int) -> Tuple[float, int]:
+    return DOUBLE_FORMAT.unpack_from(data, offset)[0], offset + DOUBLE_FORMAT.size
+
+def read_value(data: bytes, offset: int) -> Tuple[Any, int]:
+    tag = data[offset]
+    offset += 1
+    if tag == STR_TAG:
+        return read_str(data, offset)
+    if tag == DICT_TAG:
+        count, offset = read_varint(data, offset)
+        items = {}
+        for _ in range(count):
+            key, offset = read_str(data, offset)
+            # Short strings are read in place; like the keys they are interned,
+            # since every vote repeats the same keys, election and candidate ids
+            if data[offset] == STR_TAG and data[offset + 1] < 0x80:
+                end = offset + 2 + data[offset + 1]
+                items[intern(key)] = intern(data[offset + 2:end].decode())
+                offset = end
+            else:
+                items[intern(key)], offset = read_value(data, offset)
+        return items, offset
+    if tag == INT_TAG:
+        value, offset = read_varint(data, offset)
+        return (-((value + 1) >> 1) if value & 1 else value >> 1), offset
+    if tag == NONE_TAG:
+        return None, offset
+    if tag == TRUE_TAG or tag == FALSE_TAG:
+        return tag == TRUE_TAG, offset
+    if tag == FLOAT_TAG:
+        return read_double(data, offset)
+    if tag == BYTES_TAG:
+        return read_bytes(data, offset)
+    if tag == LIST_TAG:
+        count, offset = read_varint(data, offset)
+        items = []
+        for _ in range(count):
+            item, offset = read_value(data, offset)
+            items.append(item)
+        return items, offset
+    raise ValueError(f"Unknown value tag {tag}")
+
+def decode_value(data: bytes) -> Any:
+    """Decode a single value encoded by encode_value"""
+    value, offset = read_value(data, 0)
+    if offset != len(data):
+        raise ValueError("Trailing bytes after encoded value")
+    return value
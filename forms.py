@@ -93,6 +93,7 @@ class AdminForm(FlaskForm):
     action = SelectField('Action', choices=[
         ('mine', 'Mine Pending Transactions'),
         ('validate', 'Validate Blockchain'),
+        ('audit', 'Full Blockchain Audit'),
         ('export', 'Export Blockchain Data')
     ], validators=[DataRequired()])
     submit = SubmitField('Execute Action')
\ No newline at end of file
@@ -0,0 +1,63 @@
+import hashlib
+import json
+from typing import List, Dict
+
+# Domain separation between leaves and inner nodes (as in RFC 6962) so an
+# inner node can never be passed off as a transaction
+LEAF_PREFIX = b'\x00'
+NODE_PREFIX = b'\x01'
+
+EMPTY_ROOT = hashlib.sha256(b'').digest()
+
+def leaf_hash(encoded: bytes) -> bytes:
+    """Hash an encoded transaction into a Merkle leaf"""
+    return hashlib.sha256(LEAF_PREFIX + encoded).digest()
+
+def transaction_hash(transaction: Dict) -> bytes:
+    """Hash a transaction's canonical JSON into a Merkle leaf, as version 2 blocks do"""
+    return leaf_hash(json.dumps(transaction, sort_keys=True).encode())
+
+def hash_pair(left: bytes, right: bytes) -> bytes:
+    """Hash two child nodes into their parent"""
+    return hashlib.sha256(NODE_PREFIX + left + right).digest()
+
+def _next_level(level: List[bytes]) -> List[bytes]:
+    """Hash one level of the tree into the level above it"""
+    next_level = [hash_pair(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+    # An unpaired last node is carried up unchanged rather than duplicated
+    if len(level) % 2:
+        next_level.append(level[-1])
+    return next_level
+
+def merkle_root(leaves: List[bytes]) -> bytes:
+    """Compute the Merkle root of a list of leaf hashes"""
+    if not leaves:
+        return EMPTY_ROOT
+
+    level = leaves
+    while len(level) > 1:
+        level = _next_level(level)
+    return level[0]
+
+def merkle_proof(leaves: List[bytes], position: int) -> List[Dict[str, str]]:
+    """Build the inclusion proof for the leaf at the given position"""
+    proof = []
+    level = leaves
+    while len(level) > 1:
+        sibling = position ^ 1
+        if sibling < len(level):
+            proof.append({
+                'position': 'left' if sibling < position else 'right',
+                'hash': level[sibling].hex()
+            })
+        level = _next_level(level)
+        position //= 2
+    return proof
+
+def verify_merkle_proof(leaf_hex: str, proof: List[Dict[str, str]], root_hex: str) -> bool:
+    """Check that a leaf hash is included under the given Merkle root"""
+    node = bytes.fromhex(leaf_hex)
+    for step in proof:
+        sibling = bytes.fromhex(step['hash'])
+        node = hash_pair(sibling, node) if step['position'] == 'left' else hash_pair(node, sibling)
+    return node.hex() == root_hex
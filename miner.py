@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+"""
+Miner Process for Blockchain Voting System
+This script runs the single writer that seals pending transactions into blocks,
+while the web workers serve read-only views of the shared block store
+"""
+
+import os
+import sys
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import start_miner
+
+if __name__ == "__main__":
+    print("⛏️  Starting blockchain miner...")
+    start_miner()
@@ -0,0 +1,61 @@
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Optional, Tuple
+
+from blockchain import NONCE_FORMAT
+
+# Nonces handed to a worker per task; small enough that a found hash stops
+# the search quickly, large enough to amortize the inter-process round trip
+CHUNK_SIZE = 1 << 16
+
+def search_nonces(header_prefix: bytes, difficulty: int, start: int, count: int) -> Optional[Tuple[int, str]]:
+    """Search a range of nonces for a hash meeting the difficulty"""
+    target = '0' * difficulty
+    midstate = hashlib.sha256(header_prefix)
+    for nonce in range(start, start + count):
+        sha = midstate.copy()
+        sha.update(NONCE_FORMAT.pack(nonce))
+        block_hash = sha.hexdigest()
+        if block_hash.startswith(target):
+            return nonce, block_hash
+    return None
+
+class ParallelMiner:
+    """Split the nonce search across a pool of worker processes"""
+
+    def __init__(self, workers: Optional[int] = None, chunk_size: int = CHUNK_SIZE):
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def search(self, header_prefix: bytes, difficulty: int, start: int = 0) -> Tuple[int, str]:
+        """Return the first nonce found (and its hash) at or after start"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+
+        next_start = start
+        in_flight = set()
+        try:
+            while True:
+                # Keep every worker busy with one chunk queued behind it
+                while len(in_flight) < self.workers * 2:
+                    in_flight.add(self._executor.submit(
+                        search_nonces, header_prefix, difficulty, next_start, self.chunk_size
+                    ))
+                    next_start += self.chunk_size
+
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                found = [result for result in (future.result() for future in done) if result]
+                if found:
+                    return min(found)
+        finally:
+            # Stop early: drop the chunks that have not started yet
+            for future in in_flight:
+                future.cancel()
+
+    def shutdown(self) -> None:
+        """Stop the worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
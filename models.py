@@ -1,4 +1,6 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import IntegrityError
 from flask_login import UserMixin
 from datetime import datetime
 import uuid
@@ -32,7 +34,7 @@ class Election(db.Model):
     description = db.Column(db.Text, nullable=True)
     start_date = db.Column(db.DateTime, nullable=False)
     end_date = db.Column(db.DateTime, nullable=False)
-    is_active = db.Column(db.Boolean, default=True)
+    is_active = db.Column(db.Boolean, default=True, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Relationship with candidates and votes
@@ -55,17 +57,26 @@ class Candidate(db.Model):
     name = db.Column(db.String(100), nullable=False)
     party = db.Column(db.String(100), nullable=True)
     description = db.Column(db.Text, nullable=True)
-    election_id = db.Column(db.String(36), db.ForeignKey('election.id'), nullable=False)
+    election_id = db.Column(db.String(36), db.ForeignKey('election.id'), nullable=False, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
-    # Relationship with votes
+    # Relationship with votes and the materialized vote counter
     votes = db.relationship('Vote', backref='candidate', lazy=True)
+    tally = db.relationship('CandidateTally', backref='candidate', uselist=False, cascade='all, delete-orphan')
     
     def __repr__(self):
         return f'<Candidate {self.name}>'
 
 class Vote(db.Model):
     """Vote model for tracking votes in the blockchain"""
+    __table_args__ = (
+        # One vote per voter per election, enforced by the database
+        db.Index('uq_vote_voter_election', 'voter_id', 'election_id', unique=True),
+        # Per-election results and per-candidate counts
+        db.Index('ix_vote_election_candidate', 'election_id', 'candidate_id'),
+        db.Index('ix_vote_candidate_id', 'candidate_id'),
+    )
+    
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     voter_id = db.Column(db.String(36), db.ForeignKey('voter.id'), nullable=False)
     election_id = db.Column(db.String(36), db.ForeignKey('election.id'), nullable=False)
@@ -77,6 +88,15 @@ class Vote(db.Model):
     def __repr__(self):
         return f'<Vote {self.id}>'
 
+class CandidateTally(db.Model):
+    """Materialized vote counter per candidate, updated in the same transaction as each vote"""
+    candidate_id = db.Column(db.String(36), db.ForeignKey('candidate.id'), primary_key=True)
+    election_id = db.Column(db.String(36), db.ForeignKey('election.id'), nullable=False, index=True)
+    vote_count = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<CandidateTally {self.candidate_id}: {self.vote_count}>'
+
 class BlockchainState(db.Model):
     """Model for storing blockchain state and metadata"""
     id = db.Column(db.Integer, primary_key=True)
@@ -100,4 +120,46 @@ class PendingTransaction(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     def __repr__(self):
-        return f'<PendingTransaction {self.id}>' 
\ No newline at end of file
+        return f'<PendingTransaction {self.id}>' 
+
+def ensure_indexes():
+    """Create indexes missing from an existing database
+    
+    db.create_all() only creates missing tables, so databases created before
+    an index was declared are migrated here. A unique index cannot be built
+    while duplicate rows exist; those are reported and left for cleanup.
+    """
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            try:
+                index.create(db.engine, checkfirst=True)
+            except IntegrityError:
+                print(f"⚠️  Could not create {index.name}: duplicate rows in {table.name}")
+
+def increment_candidate_tally(candidate_id, election_id, count=1):
+    """Count more votes for a candidate as part of the current transaction"""
+    result = db.session.execute(
+        update(CandidateTally)
+        .where(CandidateTally.candidate_id == candidate_id)
+        .values(vote_count=CandidateTally.vote_count + count)
+    )
+    if result.rowcount == 0:
+        db.session.add(CandidateTally(candidate_id=candidate_id, election_id=election_id, vote_count=count))
+
+def ensure_candidate_tallies():
+    """Backfill counters for candidates that do not have one yet from the Vote table"""
+    counts = dict(db.session.execute(
+        select(Vote.candidate_id, func.count()).group_by(Vote.candidate_id)
+    ).all())
+    missing = db.session.execute(
+        select(Candidate.id, Candidate.election_id)
+        .outerjoin(CandidateTally, CandidateTally.candidate_id == Candidate.id)
+        .where(CandidateTally.candidate_id.is_(None))
+    ).all()
+    for candidate_id, election_id in missing:
+        db.session.add(CandidateTally(
+            candidate_id=candidate_id,
+            election_id=election_id,
+            vote_count=counts.get(candidate_id, 0)
+        ))
+    db.session.commit()
@@ -0,0 +1,32 @@
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a request issues more SQL statements than its endpoint allows"""
+
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context():
+        g.sql_statement_count = g.get('sql_statement_count', 0) + 1
+
+def init_query_budget(app, budgets):
+    """Count SQL statements per request and enforce per-endpoint budgets
+    
+    Budgets are only enforced when app.config['ENFORCE_QUERY_BUDGETS'] is set,
+    which the tests do so that N+1 query regressions fail loudly.
+    """
+    app.config.setdefault('ENFORCE_QUERY_BUDGETS', False)
+    app.extensions['query_budgets'] = budgets
+
+    if not event.contains(Engine, 'before_cursor_execute', _count_statement):
+        event.listen(Engine, 'before_cursor_execute', _count_statement)
+
+    @app.after_request
+    def check_query_budget(response):
+        budget = app.extensions['query_budgets'].get(request.endpoint)
+        count = g.get('sql_statement_count', 0)
+        if app.config['ENFORCE_QUERY_BUDGETS'] and budget is not None and count > budget:
+            raise QueryBudgetExceeded(
+                f"{request.endpoint} issued {count} SQL statements (budget {budget})"
+            )
+        return response
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Reconcile Tallies Script
+This script checks the materialized candidate vote counters against the blockchain
+"""
+
+import sys
+import os
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import app, reconcile_candidate_tallies
+
+def reconcile_tallies(fix=False):
+    """Report (and optionally repair) counters that disagree with the chain"""
+    print("🔍 Reconciling candidate vote counters with the blockchain...")
+    
+    with app.app_context():
+        mismatches = reconcile_candidate_tallies(fix=fix)
+        
+        if not mismatches:
+            print("✅ All candidate counters match the blockchain")
+            return True
+        
+        print(f"❌ Found {len(mismatches)} mismatched counters:")
+        for candidate_id, counter, expected in mismatches:
+            print(f"   - Candidate {candidate_id}: counter {counter}, chain + pending {expected}")
+        if fix:
+            print("✅ Counters reset to the blockchain values")
+        else:
+            print("\n💡 Run with --fix to reset the counters")
+        return False
+
+if __name__ == "__main__":
+    ok = reconcile_tallies(fix='--fix' in sys.argv)
+    sys.exit(0 if ok else 1)
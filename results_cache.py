@@ -0,0 +1,78 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+class FileResultsBackend:
+    """Shared results cache kept as JSON files, e.g. on a disk all workers mount
+
+    Each election has one file holding the results of the latest height
+    written, so the directory does not grow as blocks are sealed.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+
+    def _path(self, election_id: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(election_id.encode()).hexdigest() + '.json')
+
+    def get(self, election_id: str, height: int) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(election_id)) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return entry['results'] if entry.get('height') == height else None
+
+    def set(self, election_id: str, height: int, value: Dict[str, Any]) -> None:
+        # Write to a temporary file first so readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'height': height, 'results': value}, f)
+        os.replace(tmp_path, self._path(election_id))
+
+class ResultsCache:
+    """Read-through cache of election results keyed by (election_id, chain height)
+
+    Results only change when a block is appended, so an entry is reused until
+    the chain grows and is then recomputed on the next read. Each election
+    keeps only its latest height in the in-process LRU; a shared backend can
+    be added so other workers reuse the computed results.
+    """
+
+    def __init__(self, max_entries: int = 256, backend=None):
+        self.max_entries = max_entries
+        self.backend = backend
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def etag(election_id: str, height: int) -> str:
+        """Entity tag for the results of an election at a chain height"""
+        return hashlib.sha256(f'{election_id}:{height}'.encode()).hexdigest()[:32]
+
+    def get(self, election_id: str, height: int, compute: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """Return cached results for this height, computing them on a miss"""
+        with self._lock:
+            entry = self._entries.get(election_id)
+            if entry is not None and entry[0] == height:
+                self._entries.move_to_end(election_id)
+                return entry[1]
+
+        results = self.backend.get(election_id, height) if self.backend is not None else None
+        if results is None:
+            results = compute()
+            if self.backend is not None:
+                self.backend.set(election_id, height, results)
+
+        with self._lock:
+            self._entries[election_id] = (height, results)
+            self._entries.move_to_end(election_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return results
@@ -0,0 +1,121 @@
+import json
+import threading
+import time
+from collections import deque
+from typing import Dict, Iterator, Optional
+
+# Events kept per election so reconnecting clients can resume with Last-Event-ID
+EVENT_HISTORY = 100
+
+class _Channel:
+    """Shared fan-out point for every subscriber of one election"""
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.events = deque(maxlen=EVENT_HISTORY)
+        self.last_block_index = -1
+
+class ResultsBroadcaster:
+    """Push per-election tally deltas to Server-Sent Events subscribers
+
+    Each appended block is turned into one pre-encoded event per election it
+    touches, so the work done per block does not depend on how many clients
+    are listening; subscribers only wait on a shared condition and forward
+    the already encoded messages.
+    """
+
+    def __init__(self, blockchain, poll_interval: float = 1.0):
+        self.blockchain = blockchain
+        self.poll_interval = poll_interval
+        self._channels: Dict[str, _Channel] = {}
+        self._lock = threading.Lock()
+        self._poller: Optional[threading.Thread] = None
+        blockchain.add_listener(self.publish_block)
+
+    def _channel(self, election_id: str) -> _Channel:
+        with self._lock:
+            channel = self._channels.get(election_id)
+            if channel is None:
+                channel = self._channels[election_id] = _Channel()
+            return channel
+
+    def publish_block(self, block) -> None:
+        """Fan out the vote deltas of a newly appended block"""
+        deltas: Dict[str, Dict[str, int]] = {}
+        for transaction in block.transactions:
+            data = transaction.data
+            if data.get('type') == 'vote' and data.get('candidate'):
+                delta = deltas.setdefault(data.get('election_id'), {})
+                delta[data['candidate']] = delta.get(data['candidate'], 0) + 1
+
+        for election_id, delta in deltas.items():
+            # Nobody has subscribed to this election yet, so there is nothing to push
+            with self._lock:
+                channel = self._channels.get(election_id)
+            if channel is None:
+                continue
+
+            vote_counts = self.blockchain.get_vote_count(election_id)
+            payload = json.dumps({
+                'election_id': election_id,
+                'block_index': block.index,
+                'delta': delta,
+                'vote_counts': vote_counts,
+                'total_votes': self.blockchain.get_vote_total(election_id)
+            })
+            with channel.condition:
+                channel.events.append((block.index, f'id: {block.index}\nevent: tally\ndata: {payload}\n\n'))
+                channel.last_block_index = block.index
+                channel.condition.notify_all()
+
+    def _snapshot(self, election_id: str, block_index: int) -> str:
+        """Encode the current totals as the first event of a new stream"""
+        payload = json.dumps({
+            'election_id': election_id,
+            'block_index': block_index,
+            'vote_counts': self.blockchain.get_vote_count(election_id),
+            'total_votes': self.blockchain.get_vote_total(election_id)
+        })
+        return f'id: {block_index}\nevent: snapshot\ndata: {payload}\n\n'
+
+    def listen(self, election_id: str, last_event_id: int = -1, heartbeat: float = 15.0) -> Iterator[str]:
+        """Yield encoded events for an election as blocks are appended
+
+        New subscribers start with a snapshot of the current totals; clients
+        reconnecting with a Last-Event-ID resume from the following block.
+        """
+        channel = self._channel(election_id)
+        self._ensure_poller()
+        last_seen = last_event_id
+        if last_seen < 0:
+            last_seen = len(self.blockchain.chain) - 1
+            yield self._snapshot(election_id, last_seen)
+
+        while True:
+            with channel.condition:
+                if channel.last_block_index <= last_seen:
+                    channel.condition.wait(heartbeat)
+                messages = [(index, message) for index, message in channel.events if index > last_seen]
+
+            if not messages:
+                # Comment lines keep proxies from closing an idle stream
+                yield ': keep-alive\n\n'
+                continue
+            for index, message in messages:
+                last_seen = index
+                yield message
+
+    def _ensure_poller(self) -> None:
+        """Follow blocks sealed by another process with one polling thread per process"""
+        with self._lock:
+            if self._poller is None:
+                self._poller = threading.Thread(target=self._poll, daemon=True)
+                self._poller.start()
+
+    def _poll(self) -> None:
+        while True:
+            try:
+                self.blockchain.refresh()
+            except Exception as e:
+                print(f"Error following blockchain: {e}")
+            time.sleep(self.poll_interval)
@@ -0,0 +1,46 @@
+import threading
+import time
+from typing import Optional
+
+class SealScheduler:
+    """Decide when the miner seals a block: once enough transactions are
+    pending or the oldest one has waited max_latency seconds, whichever
+    comes first
+
+    Votes cast in the same process wake the miner through a condition; votes
+    accepted by other web workers are picked up within poll_interval.
+    """
+
+    def __init__(self, batch_size: int = 100, max_latency: float = 2.0, poll_interval: float = 1.0):
+        self.batch_size = batch_size
+        self.max_latency = max_latency
+        self.poll_interval = poll_interval
+        self._condition = threading.Condition()
+        self._arrivals = 0
+
+    def notify(self, count: int = 1) -> None:
+        """Record newly accepted transactions, waking the miner when it has work to plan"""
+        with self._condition:
+            self._arrivals += count
+            # The first arrival arms the latency deadline and a full batch seals
+            # right away; arrivals in between need no extra wake-up
+            if self._arrivals == count or self._arrivals >= self.batch_size:
+                self._condition.notify_all()
+
+    def delay(self, pending: int, oldest_timestamp: Optional[float], now: Optional[float] = None) -> float:
+        """Seconds to wait before sealing the pending pool; 0 means seal now"""
+        if pending >= self.batch_size:
+            return 0.0
+        if not pending:
+            return self.poll_interval
+
+        now = time.time() if now is None else now
+        remaining = oldest_timestamp + self.max_latency - now
+        return max(0.0, min(remaining, self.poll_interval))
+
+    def wait(self, timeout: float) -> None:
+        """Sleep until the timeout or until new transactions arrive"""
+        with self._condition:
+            if not self._arrivals:
+                self._condition.wait(timeout)
+            self._arrivals = 0
@@ -0,0 +1,63 @@
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+
+# Applied to every new SQLite connection, in this order. WAL lets requests
+# read while the miner or the ballot writer commits, and with
+# synchronous=NORMAL a commit appends to the WAL without an fsync; the WAL is
+# synced at checkpoints. busy_timeout comes first because switching the
+# journal mode takes the lock, which other new connections may be holding
+SQLITE_PRAGMAS = {
+    'busy_timeout': 15000,
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -16000,
+    'temp_store': 'MEMORY',
+}
+
+def is_sqlite(database_uri: str) -> bool:
+    return make_url(database_uri).get_backend_name() == 'sqlite'
+
+def sqlite_engine_options(database_uri: str, pool_size: int = 10, max_overflow: int = 20) -> Dict[str, Any]:
+    """SQLALCHEMY_ENGINE_OPTIONS for a SQLite database; other databases keep the defaults
+
+    Pooled connections keep their pragmas, so they are only set once per
+    connection rather than on every request.
+    """
+    if not is_sqlite(database_uri) or make_url(database_uri).database in (None, '', ':memory:'):
+        return {}
+    return {'pool_size': pool_size, 'max_overflow': max_overflow}
+
+def init_sqlite_pragmas(engine: Engine, pragmas: Optional[Dict[str, Any]] = None) -> None:
+    """Set the pragmas on each connection the engine opens, if it is a SQLite engine"""
+    if engine.dialect.name != 'sqlite':
+        return
+    pragmas = dict(SQLITE_PRAGMAS, **(pragmas or {}))
+
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name}={value}')
+        finally:
+            cursor.close()
+        connection_record.info['synchronous'] = pragmas['synchronous']
+
+    @event.listens_for(engine, 'checkin')
+    def restore_synchronous(dbapi_connection, connection_record):
+        if dbapi_connection is not None and connection_record.info.pop('full_sync', False):
+            dbapi_connection.execute(f"PRAGMA synchronous={connection_record.info['synchronous']}")
+
+def require_full_sync(session) -> None:
+    """Make the session's next commit durable by itself rather than at the next WAL checkpoint
+
+    For writes that replace another durable record, such as journaled
+    ballots; the connection goes back to the pool with its usual setting.
+    """
+    connection = session.connection()
+    if connection.dialect.name == 'sqlite' and connection.info.get('synchronous', 'FULL') != 'FULL':
+        connection.exec_driver_sql('PRAGMA synchronous=FULL')
+        connection.info['full_sync'] = True
@@ -4,15 +4,45 @@ Test script for the Blockchain Voting System
 This script tests the core functionality of the voting system
 """
 
+import os
 import sys
+import tempfile
+import threading
 import time
+import uuid
 from datetime import datetime, timedelta
-from blockchain import Blockchain
-from models import db, Voter, Election, Candidate, Vote, BlockchainState, PendingTransaction
-from app import app, init_db
+
+# Keep ballot journals written by the tests out of the real instance/ballots;
+# app reads this at import and the directory is removed when the run exits
+BALLOT_JOURNAL_DIR = tempfile.TemporaryDirectory(prefix='voting-test-ballots-')
+os.environ['BALLOT_JOURNAL_DIR'] = BALLOT_JOURNAL_DIR.name
+
+from blockchain import Block, Blockchain, Transaction, DuplicateVoteError
+from block_store import BlockStore
+from mining import ParallelMiner
+from merkle import verify_merkle_proof
+from query_budget import QueryBudgetExceeded
+from results_cache import ResultsCache, FileResultsBackend
+from consensus import ProofOfAuthority, load_authority_key, public_key_bytes
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+from results_stream import ResultsBroadcaster
+from seal_scheduler import SealScheduler
+from chain_metrics import InclusionMetrics
+from sqlite_tuning import require_full_sync
+from ballot_queue import BallotJournal, BallotQueue
+from models import (db, Voter, Election, Candidate, Vote, BlockchainState, PendingTransaction, CandidateTally,
+                    ensure_indexes, increment_candidate_tally)
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import IntegrityError
+from app import (app, init_db, seal_pending_transactions, reconcile_candidate_tallies, commit_ballots, ballot_queue,
+                 blockchain as app_blockchain)
 from werkzeug.security import generate_password_hash
 import json
 
+def setup_module(module):
+    """Create the schema once before pytest runs the tests"""
+    init_db()
+
 def test_blockchain():
     """Test the blockchain functionality"""
     print("🧪 Testing Blockchain Core...")
@@ -55,6 +85,378 @@ def test_blockchain():
     
     print("✅ Blockchain tests passed!")
 
+def test_tally_index():
+    """Test that the tally index matches a full rebuild from the chain"""
+    print("🧪 Testing Tally Index...")
+    
+    blockchain = Blockchain()
+    for i, candidate in enumerate(["Candidate A", "Candidate B", "Candidate A"]):
+        blockchain.add_transaction(f"voter{i}", "ELECTION_SYSTEM", {
+            "type": "vote",
+            "election_id": "tally_election",
+            "candidate": candidate,
+            "voter_id": f"voter{i}"
+        })
+        blockchain.mine_pending_transactions("test_miner")
+    
+    assert blockchain.get_vote_count("tally_election") == {"Candidate A": 2, "Candidate B": 1}
+    results = blockchain.get_election_results("tally_election")
+    assert [vote["block_index"] for vote in results["votes"]] == [1, 2, 3], "Votes should keep chain order"
+    
+    blockchain.rebuild_tally_index()
+    assert blockchain.get_election_results("tally_election") == results, "Rebuild should match incremental index"
+    
+    # A backlog larger than the block limits is split across several blocks
+    blockchain.max_block_transactions = 2
+    for i in range(5):
+        blockchain.add_transaction(f"backlog{i}", "ELECTION_SYSTEM", {"type": "vote", "election_id": "backlog", "candidate": "A"})
+    blocks = blockchain.mine_pending_transactions("test_miner")
+    assert [len(block.transactions) for block in blocks] == [2, 2, 2], "Blocks should respect the transaction limit"
+    assert len(blockchain.pending_transactions) == 3, "Each block should queue its mining reward"
+    blockchain.max_block_bytes = 1
+    blocks = blockchain.mine_pending_transactions("test_miner")
+    assert [len(block.transactions) for block in blocks] == [1, 1, 1], "Blocks should respect the byte limit"
+    assert blockchain.get_vote_count("backlog") == {"A": 5} and blockchain.is_chain_valid()
+    assert blockchain.get_vote_count("unknown_election") == {}, "Unknown election should have no votes"
+    
+    print("✅ Tally index tests passed!")
+
+def test_duplicate_votes():
+    """Test that the chain refuses a second vote by the same voter"""
+    print("🧪 Testing Duplicate Vote Detection...")
+    
+    blockchain = Blockchain()
+    blockchain.difficulty = 1
+    vote = {"type": "vote", "election_id": "dup_election", "candidate": "A", "voter_id": "VOTER1"}
+    blockchain.add_transaction("VOTER1", "ELECTION_SYSTEM", vote)
+    for attempt in ("pending", "sealed"):
+        try:
+            blockchain.add_transaction("VOTER1", "ELECTION_SYSTEM", vote)
+            assert False, f"A duplicate of a {attempt} vote should be rejected at admission"
+        except DuplicateVoteError:
+            pass
+        blockchain.mine_pending_transactions("test_miner")
+    assert blockchain.has_voted("dup_election", "VOTER1") and not blockchain.has_voted("dup_election", "VOTER2")
+    blockchain.add_transaction("VOTER1", "ELECTION_SYSTEM", dict(vote, election_id="other_election"))
+    
+    # A vote replayed straight into the pool is dropped again at sealing
+    replay = Transaction("VOTER1", "ELECTION_SYSTEM", vote, time.time(), str(uuid.uuid4()))
+    blockchain.pending_transactions.append(replay)
+    blocks = blockchain.mine_pending_transactions("test_miner")
+    assert replay not in blocks[0].transactions and blockchain.rejected_transactions == [replay]
+    assert blockchain.get_vote_count("dup_election") == {"A": 1}, "Only the first vote should be counted"
+    
+    print("✅ Duplicate vote detection tests passed!")
+
+def test_compact_representation():
+    """Test that compact blocks and transactions round-trip to the same dicts"""
+    print("🧪 Testing Compact Representation...")
+    
+    receipt = "0b5f3c9e-9d2a-4f4e-8a53-3b1d2f6c7e81"
+    vote = Transaction("voter1", "ELECTION_SYSTEM", {"type": "vote", "election_id": "compact_election"}, 1.5, receipt)
+    custom = Transaction("voter2", "ELECTION_SYSTEM", {"type": "vote"}, 2.5, "not-a-uuid")
+    assert isinstance(vote._id, bytes) and len(vote._id) == 16, "UUID ids should be stored as 16 bytes"
+    assert vote.to_dict()["transaction_id"] == receipt and custom["transaction_id"] == "not-a-uuid", "Ids should round-trip"
+    
+    block = Block(1, [vote, custom.to_dict()], 3.5, "ab" * 32)
+    assert not hasattr(block, "__dict__"), "Blocks should not carry a per-instance __dict__"
+    assert len(block._hash) == 32, "Block hashes should be stored as 32 bytes"
+    restored = Block.from_dict(json.loads(json.dumps(block.to_dict())))
+    assert restored.to_dict() == block.to_dict(), "Block dict view should round-trip"
+    assert restored.calculate_hash() == block.hash, "Restored block should hash identically"
+    
+    print("✅ Compact representation tests passed!")
+
+def test_binary_encoding():
+    """Test the binary block encoding used for hashing and storage"""
+    print("🧪 Testing Binary Encoding...")
+    
+    data = {"type": "vote", "election_id": "binary_election", "weight": -3, "share": 0.1, "flags": [True, None]}
+    vote = Transaction("voter1", "ELECTION_SYSTEM", data, 1.5, str(uuid.uuid4()))
+    reordered = Transaction("voter1", "ELECTION_SYSTEM", dict(reversed(list(data.items()))), 1.5, vote.transaction_id)
+    assert vote.to_bytes() == reordered.to_bytes(), "The encoding should not depend on key order"
+    assert Transaction.from_bytes(vote.to_bytes()).to_dict() == vote.to_dict(), "Transactions should round-trip"
+    assert len(vote.to_bytes()) < len(json.dumps(vote.to_dict(), sort_keys=True)), "Binary should be smaller than JSON"
+    
+    block = Block(1, [vote], 3.5, "ab" * 32)
+    block.signature = bytes(64)
+    restored = Block.from_bytes(block.to_bytes())
+    assert restored.to_dict() == block.to_dict() and restored.calculate_hash() == block.hash, "Blocks should round-trip"
+    try:
+        Block.from_bytes(block.to_bytes()[:-1])
+        assert False, "A truncated block should be rejected"
+    except ValueError:
+        pass
+    
+    # Stores written as JSON text keep loading next to newly appended binary rows
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "blockchain.db")
+        store = BlockStore(path)
+        blockchain = Blockchain()
+        blockchain.difficulty = 1
+        store.insert_genesis(blockchain.chain[0])
+        store._conn.execute("UPDATE blocks SET data = ?", (json.dumps(blockchain.chain[0].to_dict()),))
+        store._conn.commit()
+        reloaded = Blockchain(store=store)
+        reloaded.difficulty = 1
+        reloaded.add_transaction("voter1", "ELECTION_SYSTEM", {"type": "vote", "election_id": "binary_election"})
+        reloaded.mine_pending_transactions("test_miner")
+        store.close()
+        
+        store = BlockStore(path)
+        assert [row[0] for row in store._conn.execute("SELECT typeof(data) FROM blocks ORDER BY block_index")] == \
+            ["text", "blob"], "New blocks should be stored in the binary format"
+        assert [block.hash for block in Blockchain(store=store).chain] == [block.hash for block in reloaded.chain]
+        store.close()
+    
+    print("✅ Binary encoding tests passed!")
+
+def test_block_header_hashing():
+    """Test that the binary block header commits to every transaction"""
+    print("🧪 Testing Block Header Hashing...")
+    
+    blockchain = Blockchain()
+    blockchain.add_transaction("voter1", "ELECTION_SYSTEM", {
+        "type": "vote",
+        "election_id": "header_election",
+        "candidate": "Candidate A",
+        "voter_id": "voter1"
+    })
+    blockchain.mine_pending_transactions("test_miner")
+    block = blockchain.get_latest_block()
+    
+    assert block.hash.startswith("0" * blockchain.difficulty), "Mined hash should meet the difficulty"
+    assert block.hash == block.calculate_hash(), "Midstate mining should match a full rehash"
+    
+    block.transactions[0]["data"]["candidate"] = "Candidate B"
+    assert not blockchain.is_chain_valid(), "Tampering with a transaction should invalidate the chain"
+    
+    print("✅ Block header hashing tests passed!")
+
+def test_merkle_proof():
+    """Test Merkle inclusion proofs for vote receipts"""
+    print("🧪 Testing Merkle Proofs...")
+    
+    blockchain = Blockchain()
+    for i in range(5):
+        blockchain.add_transaction(f"voter{i}", "ELECTION_SYSTEM", {
+            "type": "vote",
+            "election_id": "proof_election",
+            "candidate": "Candidate A",
+            "voter_id": f"voter{i}"
+        }, transaction_id=f"receipt-{i}")
+    blockchain.mine_pending_transactions("test_miner")
+    
+    proof = blockchain.get_transaction_proof("receipt-3")
+    assert proof["block"]["index"] == 1, "Receipt should resolve to the sealed block"
+    assert len(proof["proof"]) <= 3, "Proof should be logarithmic in the block size"
+    assert verify_merkle_proof(proof["transaction_hash"], proof["proof"], proof["merkle_root"]), "Proof should verify"
+    assert not verify_merkle_proof(proof["transaction_hash"], proof["proof"][1:], proof["merkle_root"]), "Truncated proof should fail"
+    assert blockchain.get_transaction_proof("missing-receipt") is None, "Unknown receipt should have no proof"
+    
+    print("✅ Merkle proof tests passed!")
+
+def test_parallel_mining():
+    """Test that the parallel miner produces hashes the chain accepts"""
+    print("🧪 Testing Parallel Mining...")
+    
+    blockchain = Blockchain()
+    blockchain.miner = ParallelMiner(workers=2, chunk_size=4096)
+    try:
+        blockchain.add_transaction("voter1", "ELECTION_SYSTEM", {"type": "vote", "election_id": "parallel_election"})
+        blockchain.mine_pending_transactions("test_miner")
+    finally:
+        blockchain.miner.shutdown()
+    
+    assert blockchain.get_latest_block().hash.startswith("0" * blockchain.difficulty), "Parallel hash should meet the difficulty"
+    assert blockchain.is_chain_valid(), "Parallel-mined block should pass validation"
+    
+    print("✅ Parallel mining tests passed!")
+
+def test_incremental_validation():
+    """Test the verified-checkpoint cursor and the parallel full audit"""
+    print("🧪 Testing Incremental Validation...")
+    
+    blockchain = Blockchain()
+    blockchain.difficulty = 2
+    for i in range(4):
+        blockchain.add_transaction(f"voter{i}", "ELECTION_SYSTEM", {"type": "vote", "election_id": "audit_election"})
+        blockchain.mine_pending_transactions("test_miner")
+    
+    assert blockchain.is_chain_valid(), "Chain should be valid"
+    assert blockchain.verified_index == 4, "Cursor should advance to the latest block"
+    
+    # Blocks behind the cursor are skipped by incremental validation but not by an audit
+    blockchain.chain[2].transactions[0]["data"]["election_id"] = "tampered"
+    assert blockchain.is_chain_valid(), "Incremental validation should only check new blocks"
+    assert not blockchain.is_chain_valid(full=True), "Full validation should catch the tampering"
+    assert not blockchain.audit_chain(workers=2), "Parallel audit should catch the tampering"
+    
+    print("✅ Incremental validation tests passed!")
+
+def test_proof_of_authority():
+    """Test sealing blocks with an authority signature instead of proof-of-work"""
+    print("🧪 Testing Proof of Authority...")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        key = load_authority_key(os.path.join(tmp, "authority_key.pem"))
+        assert public_key_bytes(load_authority_key(os.path.join(tmp, "authority_key.pem")).public_key()) == \
+            public_key_bytes(key.public_key()), "The generated key should be reused"
+        
+        store = BlockStore(os.path.join(tmp, "chain.db"))
+        blockchain = Blockchain(store=store, consensus=ProofOfAuthority(key))
+        for i in range(3):
+            blockchain.add_transaction(f"voter{i}", "ELECTION_SYSTEM", {"type": "vote", "election_id": "poa_election"})
+            blockchain.mine_pending_transactions("authority")
+        assert all(block.signature for block in blockchain.chain), "Every block should be signed"
+        assert blockchain.is_chain_valid(full=True) and blockchain.audit_chain(workers=2), "Signed chain should verify"
+        
+        # A reader holding only the public key can verify but not seal
+        reader = Blockchain(store=store, writable=False,
+                            consensus=ProofOfAuthority(authorities=[public_key_bytes(key.public_key())]))
+        assert len(reader.chain) == 4
+        try:
+            Blockchain(store=store, consensus=ProofOfAuthority(Ed25519PrivateKey.generate())).chain
+            assert False, "Blocks signed by another authority should be rejected"
+        except ValueError:
+            pass
+        
+        blockchain.chain[2].signature = bytes(64)
+        assert not blockchain.is_chain_valid(full=True), "A forged signature should fail validation"
+        store.close()
+    
+    # A proof-of-work chain can switch to authority sealing from a given height
+    blockchain = Blockchain()
+    blockchain.difficulty = 2
+    blockchain.add_transaction("voter", "ELECTION_SYSTEM", {"type": "vote", "election_id": "poa_election"})
+    blockchain.mine_pending_transactions("miner")
+    blockchain.consensus = ProofOfAuthority(Ed25519PrivateKey.generate(), activation_height=len(blockchain.chain))
+    blockchain.mine_pending_transactions("authority")
+    assert blockchain.is_chain_valid(full=True), "Blocks before the activation height keep their proof-of-work"
+    
+    print("✅ Proof of authority tests passed!")
+
+def test_results_cache():
+    """Test that cached results are reused until the chain grows"""
+    print("🧪 Testing Results Cache...")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        calls = []
+        def compute():
+            calls.append(1)
+            return {"total_votes": len(calls)}
+        
+        cache = ResultsCache(backend=FileResultsBackend(tmp))
+        assert cache.get("cached_election", 1, compute) == {"total_votes": 1}
+        assert cache.get("cached_election", 1, compute) == {"total_votes": 1}, "Same height should be served from cache"
+        assert cache.get("cached_election", 2, compute) == {"total_votes": 2}, "A new block should invalidate the entry"
+        
+        # Another worker with an empty LRU reuses the shared file store
+        assert ResultsCache(backend=FileResultsBackend(tmp)).get("cached_election", 2, compute) == {"total_votes": 2}
+        assert len(calls) == 2, "Results should only be computed once per height"
+        assert len(os.listdir(tmp)) == 1, "Each election should keep a single cache file"
+    
+    client = app.test_client()
+    response = client.get("/api/election/cached_election/results")
+    assert response.status_code == 200 and response.headers["ETag"], "Results should carry an ETag"
+    response = client.get("/api/election/cached_election/results", headers={"If-None-Match": response.headers["ETag"]})
+    assert response.status_code == 304, "Unchanged results should revalidate with 304"
+    
+    print("✅ Results cache tests passed!")
+
+def test_results_stream():
+    """Test that sealed votes are pushed to results stream subscribers"""
+    print("🧪 Testing Results Stream...")
+    
+    blockchain = Blockchain()
+    blockchain.difficulty = 2
+    broadcaster = ResultsBroadcaster(blockchain)
+    stream = broadcaster.listen("stream_election", heartbeat=0.1)
+    
+    snapshot = next(stream)
+    assert "event: snapshot" in snapshot, "A new subscriber should first receive the current totals"
+    
+    blockchain.add_transaction("voter_1", "stream_election", {"type": "vote", "election_id": "stream_election", "candidate": "Alice"})
+    blockchain.mine_pending_transactions("system")
+    
+    message = next(stream)
+    payload = json.loads(message.split("data: ", 1)[1])
+    assert message.startswith("id: 1\nevent: tally"), "Each sealed block should produce one tally event"
+    assert payload["delta"] == {"Alice": 1} and payload["total_votes"] == 1
+    
+    # A reconnecting client resumes after the last event it saw
+    resumed = broadcaster.listen("stream_election", last_event_id=0, heartbeat=0.1)
+    assert next(resumed) == message, "Missed events should be replayed from Last-Event-ID"
+    
+    print("✅ Results stream tests passed!")
+
+def test_block_store():
+    """Test that the chain reloads from the on-disk block store"""
+    print("🧪 Testing Block Store...")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "blockchain.db")
+        blockchain = Blockchain(store=BlockStore(path))
+        reader = Blockchain(store=BlockStore(path), writable=False)
+        assert blockchain.store.count() == 0, "The chain should only be loaded on first use"
+        assert len(reader.chain) == 1 and reader.chain[0].hash == blockchain.chain[0].hash, "Genesis should be deterministic"
+        blockchain.add_transaction("voter1", "ELECTION_SYSTEM", {
+            "type": "vote",
+            "election_id": "store_election",
+            "candidate": "Candidate A",
+            "voter_id": "voter1"
+        })
+        blockchain.mine_pending_transactions("test_miner")
+        blockchain.store.close()
+        
+        assert reader.refresh() == 1, "Reader should pick up the block sealed by the writer"
+        assert reader.get_vote_count("store_election") == {"Candidate A": 1}, "Reader tally should follow the writer"
+        reader.store.close()
+        
+        store = BlockStore(path)
+        reloaded = Blockchain(store=store)
+        assert [block.hash for block in reloaded.chain] == [block.hash for block in blockchain.chain], "Chain should survive a restart"
+        assert reloaded.is_chain_valid(), "Reloaded chain should be valid"
+        assert reloaded.get_vote_count("store_election") == {"Candidate A": 1}, "Tally index should be rebuilt on load"
+        store.close()
+    
+    print("✅ Block store tests passed!")
+
+def test_transaction_index():
+    """Test receipt and per-address lookups through the secondary indexes"""
+    print("🧪 Testing Transaction Index...")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "blockchain.db")
+        for blockchain in (Blockchain(), Blockchain(store=BlockStore(path))):
+            blockchain.difficulty = 1
+            receipts = []
+            for i in range(3):
+                receipts.append(str(uuid.uuid4()))
+                blockchain.add_transaction(f"VOTER{i}", "ELECTION_SYSTEM", {
+                    "type": "vote", "election_id": "index_election", "voter_id": f"VOTER{i}"
+                }, transaction_id=receipts[-1])
+                blockchain.mine_pending_transactions("index_miner")
+            
+            block, position = blockchain.locate_transaction(receipts[1])
+            assert block.transactions[position].transaction_id == receipts[1], "Receipt should resolve to its transaction"
+            assert blockchain.locate_transaction("missing") is None
+            assert [tx.transaction_id for _, tx in blockchain.get_address_transactions("VOTER2")] == [receipts[2]]
+            assert blockchain.get_balance("index_miner") == 2 * blockchain.mining_reward, "Sealed rewards should count"
+        
+        # A store written before the index existed is indexed by init-db
+        blockchain.store._conn.execute("DELETE FROM transaction_index")
+        blockchain.store._conn.execute("DELETE FROM meta WHERE key = 'transaction_index'")
+        blockchain.store._conn.commit()
+        blockchain.store.close()
+        store = BlockStore(path)
+        assert store.locate_transaction(receipts[0]) is None, "Opening a store should not index the chain"
+        store.backfill_index()
+        assert store.locate_transaction(receipts[0]) == (1, 0), "Existing blocks should be backfilled"
+        store.close()
+    
+    print("✅ Transaction index tests passed!")
+
 def test_database():
     """Test the database models"""
     print("🧪 Testing Database Models...")
@@ -130,6 +532,88 @@ def test_voting_process():
         
         print("✅ Voting process tests passed!")
 
+def test_vote_constraints():
+    """Test the vote indexes, the one-vote-per-election constraint and index migration"""
+    print("🧪 Testing Vote Constraints...")
+    
+    with app.app_context():
+        indexes = {index["name"] for index in inspect(db.engine).get_indexes("vote")}
+        assert {"uq_vote_voter_election", "ix_vote_election_candidate", "ix_vote_candidate_id"} <= indexes, "Vote indexes should exist"
+        
+        # Databases created before the indexes existed are migrated by ensure_indexes
+        db.session.execute(text("DROP INDEX uq_vote_voter_election"))
+        db.session.commit()
+        ensure_indexes()
+        assert "uq_vote_voter_election" in {index["name"] for index in inspect(db.engine).get_indexes("vote")}, "Missing index should be recreated"
+        
+        existing = Vote.query.first()
+        db.session.add(Vote(voter_id=existing.voter_id, election_id=existing.election_id, candidate_id=existing.candidate_id))
+        try:
+            db.session.commit()
+            assert False, "A second vote in the same election should be rejected"
+        except IntegrityError:
+            db.session.rollback()
+        
+        print("✅ Vote constraint tests passed!")
+
+def test_sqlite_tuning():
+    """Test the SQLite pragmas and that concurrent writers wait instead of failing"""
+    print("🧪 Testing SQLite Tuning...")
+    
+    with app.app_context():
+        connection = db.session.connection()
+        assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal", "The database should use WAL"
+        assert connection.exec_driver_sql("PRAGMA synchronous").scalar() == 1, "Commits should not fsync outside checkpoints"
+        assert connection.exec_driver_sql("PRAGMA busy_timeout").scalar() >= 1000, "Writers should wait for the lock"
+        require_full_sync(db.session)
+        assert connection.exec_driver_sql("PRAGMA synchronous").scalar() == 2, "Journaled writes should commit with FULL"
+        db.session.commit()
+        connection = db.session.connection()
+        assert connection.exec_driver_sql("PRAGMA synchronous").scalar() == 1, "Pooled connections should be restored"
+        db.session.rollback()
+        
+        election = Election.query.filter_by(title="Test Election").first()
+        candidate = Candidate.query.filter_by(name="Candidate B").first()
+        tally = CandidateTally.query.filter_by(candidate_id=candidate.id).first()
+        before = tally.vote_count if tally else 0
+    
+    # Request threads commit small updates while a "miner" holds the write lock for longer
+    errors = []
+    def request_writer():
+        with app.app_context():
+            for _ in range(25):
+                try:
+                    increment_candidate_tally(candidate.id, election.id)
+                    db.session.commit()
+                except Exception as e:
+                    db.session.rollback()
+                    errors.append(e)
+    def slow_writer():
+        with app.app_context():
+            for _ in range(5):
+                try:
+                    db.session.execute(text("UPDATE blockchain_state SET last_updated = CURRENT_TIMESTAMP"))
+                    time.sleep(0.05)
+                    db.session.commit()
+                except Exception as e:
+                    db.session.rollback()
+                    errors.append(e)
+    threads = [threading.Thread(target=request_writer) for _ in range(8)] + [threading.Thread(target=slow_writer)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors, f"Concurrent writers should not fail: {errors[:3]}"
+    
+    with app.app_context():
+        tally = CandidateTally.query.filter_by(candidate_id=candidate.id).first()
+        assert tally.vote_count == before + 200, "Every concurrent increment should be committed"
+        # Leave the counter as the tests that follow expect it
+        tally.vote_count = before
+        db.session.commit()
+    
+    print("✅ SQLite tuning tests passed!")
+
 def test_blockchain_integration():
     """Test blockchain integration with database"""
     print("🧪 Testing Blockchain Integration...")
@@ -156,6 +640,356 @@ def test_blockchain_integration():
         
         print("✅ Blockchain integration tests passed!")
 
+def test_seal_pending_transactions():
+    """Test that sealing links vote records to their Merkle leaves in one batch"""
+    print("🧪 Testing Pending Transaction Sealing...")
+    
+    with app.app_context():
+        voter = Voter.query.filter_by(username="testuser").first()
+        election = Election(
+            title="Sealing Election",
+            start_date=datetime.now() - timedelta(hours=1),
+            end_date=datetime.now() + timedelta(days=1)
+        )
+        db.session.add(election)
+        db.session.commit()
+        candidate = Candidate(name="Sealed Candidate", election_id=election.id)
+        db.session.add(candidate)
+        db.session.commit()
+        
+        vote = Vote(voter_id=voter.id, election_id=election.id, candidate_id=candidate.id)
+        increment_candidate_tally(candidate.id, election.id)
+        pending_tx = PendingTransaction(
+            transaction_type="vote",
+            sender=voter.voter_id,
+            recipient="ELECTION_SYSTEM",
+            data=json.dumps({
+                "type": "vote",
+                "election_id": election.id,
+                "candidate": candidate.name,
+                "candidate_id": candidate.id,
+                "voter_id": voter.voter_id
+            }),
+            timestamp=time.time()
+        )
+        # A later transaction that will not fit in the vote's block
+        notice_tx = PendingTransaction(
+            transaction_type="election_update",
+            sender="ADMIN",
+            recipient="ELECTION_SYSTEM",
+            data=json.dumps({"type": "election_update", "election_id": election.id}),
+            timestamp=time.time() + 1
+        )
+        db.session.add_all([vote, pending_tx, notice_tx])
+        db.session.commit()
+        receipt, vote_payload = pending_tx.id, pending_tx.data
+        
+        # One transaction per block drains the pool as a pipeline of blocks
+        start_height = len(app_blockchain.chain)
+        app_blockchain.writable = True
+        app_blockchain.max_block_transactions = 1
+        try:
+            sealed = seal_pending_transactions("test_miner")
+        finally:
+            app_blockchain.writable = False
+            app_blockchain.max_block_transactions = 1000
+        
+        assert sealed >= 2 and PendingTransaction.query.count() == 0, "Every pending transaction should be sealed"
+        assert len(app_blockchain.chain) - start_height == sealed, "Each transaction should get its own block"
+        assert BlockchainState.query.first().last_block_index == app_blockchain.get_latest_block().index
+        vote = db.session.get(Vote, vote.id)
+        proof = app_blockchain.get_transaction_proof(receipt)
+        assert vote.block_index == proof["block"]["index"], "Vote should point at the block that sealed it"
+        assert vote.transaction_hash == proof["transaction_hash"], "Vote should store its Merkle leaf hash"
+        client = app.test_client()
+        assert client.get(f"/api/receipt/{receipt}").get_json()["block_index"] == vote.block_index
+        
+        # Replaying the sealed vote into the pending pool never reaches a block
+        db.session.add(PendingTransaction(
+            transaction_type="vote",
+            sender=voter.voter_id,
+            recipient="ELECTION_SYSTEM",
+            data=vote_payload,
+            timestamp=time.time()
+        ))
+        db.session.commit()
+        height = len(app_blockchain.chain)
+        assert seal_pending_transactions("test_miner") == 0 and len(app_blockchain.chain) == height
+        assert PendingTransaction.query.count() == 0, "The replayed vote should be discarded"
+        audit = client.get(f"/api/voter/{voter.voter_id}/audit").get_json()
+        assert receipt in [tx["transaction_id"] for tx in audit["transactions"]], "Audit should list the voter's vote"
+        
+        # The counter written with the vote should agree with the sealed chain
+        assert db.session.get(CandidateTally, candidate.id).vote_count == 1, "Vote should increment the candidate counter"
+        mismatches = [m for m in reconcile_candidate_tallies() if m[0] == candidate.id]
+        assert mismatches == [], "Counter should reconcile with the chain"
+        db.session.get(CandidateTally, candidate.id).vote_count = 5
+        db.session.commit()
+        assert [m for m in reconcile_candidate_tallies(fix=True) if m[0] == candidate.id] == [(candidate.id, 5, 1)], "Drift should be reported"
+        assert db.session.get(CandidateTally, candidate.id).vote_count == 1, "Fix should reset the counter"
+        
+        # A pending row whose vote is already in a block is not counted twice
+        leftover = PendingTransaction(
+            id=receipt,
+            transaction_type="vote",
+            sender=voter.voter_id,
+            recipient="ELECTION_SYSTEM",
+            data=vote_payload,
+            timestamp=time.time()
+        )
+        db.session.add(leftover)
+        db.session.commit()
+        try:
+            assert [m for m in reconcile_candidate_tallies() if m[0] == candidate.id] == [], \
+                "A sealed vote left in the pending pool should not be counted again"
+        finally:
+            db.session.delete(leftover)
+            db.session.commit()
+        
+        # A process that has not read the chain yet sees the same tallies
+        app_module = sys.modules["app"]
+        fresh = Blockchain(store=BlockStore(app_blockchain.store.path), writable=False,
+                           consensus=app_blockchain.consensus)
+        assert fresh.get_vote_count(election.id) == {candidate.name: 1}, "Tallies should load the stored chain"
+        assert fresh.get_vote_total(election.id) == 1
+        assert fresh.get_election_results(election.id)["total_votes"] == 1
+        app_module.blockchain = fresh
+        try:
+            assert [m for m in reconcile_candidate_tallies() if m[0] == candidate.id] == [], \
+                "Reconcile should count the votes sealed in the stored chain"
+        finally:
+            app_module.blockchain = app_blockchain
+            fresh.store.close()
+        
+        print("✅ Pending transaction sealing tests passed!")
+
+def test_seal_retry_after_failure():
+    """Test that a failed seal is retried without losing its votes as duplicates"""
+    print("🧪 Testing Seal Retry After Failure...")
+    
+    app_module = sys.modules["app"]
+    with app.app_context():
+        voters = [Voter(
+            username=f"retry_voter{i}",
+            email=f"retry_voter{i}@example.com",
+            password_hash=generate_password_hash("password123"),
+            first_name="Retry",
+            last_name=f"Voter{i}",
+            date_of_birth=datetime(1990, 1, 1).date(),
+            voter_id=f"RETRY{i:05d}"
+        ) for i in range(3)]
+        db.session.add_all(voters)
+        db.session.commit()
+        
+        # The vote whose block fails once, per failure mode
+        failures = {"seal": None, "commit": None}
+        def fails(mode, block):
+            if failures[mode] in [(tx.data.get("election_id"), tx.sender) for tx in block.transactions]:
+                failures[mode] = None
+                return True
+            return False
+        seal = app_blockchain.consensus.seal
+        commit_sealed_block = app_module.commit_sealed_block
+        def failing_seal(block, blockchain):
+            if fails("seal", block):
+                raise RuntimeError("Sealing failed")
+            seal(block, blockchain)
+        def failing_commit(block, pending):
+            if fails("commit", block):
+                raise RuntimeError("Commit failed")
+            commit_sealed_block(block, pending)
+        
+        # Mining the second vote's block fails, then the database commit of the first vote's block
+        for mode, failing_voter in (("seal", voters[1]), ("commit", voters[0])):
+            election = Election(
+                title=f"Retry Election ({mode})",
+                start_date=datetime.now() - timedelta(hours=1),
+                end_date=datetime.now() + timedelta(days=1)
+            )
+            db.session.add(election)
+            db.session.commit()
+            candidate = Candidate(name="Retry Candidate", election_id=election.id)
+            db.session.add(candidate)
+            db.session.commit()
+            for i, voter in enumerate(voters):
+                db.session.add(Vote(voter_id=voter.id, election_id=election.id, candidate_id=candidate.id))
+                db.session.add(PendingTransaction(
+                    transaction_type="vote",
+                    sender=voter.voter_id,
+                    recipient="ELECTION_SYSTEM",
+                    data=json.dumps({
+                        "type": "vote",
+                        "election_id": election.id,
+                        "candidate": candidate.name,
+                        "candidate_id": candidate.id,
+                        "voter_id": voter.voter_id
+                    }),
+                    timestamp=time.time() + i
+                ))
+            db.session.commit()
+            
+            failures[mode] = (election.id, failing_voter.voter_id)
+            app_blockchain.writable = True
+            app_blockchain.max_block_transactions = 1
+            app_blockchain.consensus.seal = failing_seal
+            app_module.commit_sealed_block = failing_commit
+            try:
+                try:
+                    seal_pending_transactions("test_miner")
+                    assert False, "The injected failure should abort the seal"
+                except RuntimeError:
+                    db.session.rollback()
+                seal_pending_transactions("test_miner")
+            finally:
+                app_blockchain.writable = False
+                app_blockchain.max_block_transactions = 1000
+                del app_blockchain.consensus.seal
+                app_module.commit_sealed_block = commit_sealed_block
+            
+            assert not PendingTransaction.query.filter(PendingTransaction.data.contains(election.id)).count(), \
+                f"Every pending vote should be sealed after the retry ({mode})"
+            assert app_blockchain.get_vote_count(election.id) == {candidate.name: 3}, \
+                f"No vote should be dropped as a duplicate ({mode})"
+            votes = Vote.query.filter_by(election_id=election.id).all()
+            assert all(vote.transaction_hash for vote in votes), f"Every vote should be linked to its block ({mode})"
+    
+    print("✅ Seal retry tests passed!")
+
+def test_ballot_queue():
+    """Test that votes are journaled, written in batches and recovered after a crash"""
+    print("🧪 Testing Ballot Queue...")
+    
+    # A journal whose owner died (its lock is released) is replayed and removed
+    journal_dir = tempfile.mkdtemp()
+    journal = BallotJournal(journal_dir)
+    journal.append({"id": "b1", "election_id": "e1", "voter_id": "V1"})
+    journal.append({"id": "b2", "election_id": "e1", "voter_id": "V2"})
+    journal._file.close()
+    replayed = []
+    BallotQueue(journal_dir, replayed.extend).recover()
+    assert [ballot["id"] for ballot in replayed] == ["b1", "b2"], "Journaled ballots should be replayed in order"
+    assert not os.listdir(journal_dir), "A replayed journal should be removed"
+    
+    with app.app_context():
+        voter = Voter.query.filter_by(username="testuser").first()
+        election = Election(
+            title="Queued Election",
+            start_date=datetime.now() - timedelta(hours=1),
+            end_date=datetime.now() + timedelta(days=1)
+        )
+        db.session.add(election)
+        db.session.commit()
+        candidate = Candidate(name="Queued Candidate", election_id=election.id)
+        db.session.add(candidate)
+        db.session.commit()
+        election_id, candidate_id = election.id, candidate.id
+        
+        app.config["WTF_CSRF_ENABLED"] = False
+        try:
+            client = app.test_client()
+            with client.session_transaction() as session:
+                session["_user_id"] = voter.id
+                session["_fresh"] = True
+            response = client.post(f"/vote/{election_id}", data={"candidate": candidate_id})
+            assert response.status_code == 302, "The vote should be accepted"
+            assert ballot_queue.flush(timeout=10), "The writer should drain the queue"
+            
+            pending = PendingTransaction.query.filter(PendingTransaction.data.contains(election_id)).all()
+            assert len(pending) == 1 and Vote.query.filter_by(election_id=election_id).count() == 1, \
+                "The ballot should be written as a pending transaction and a vote record"
+            assert CandidateTally.query.filter_by(candidate_id=candidate_id).first().vote_count == 1
+            
+            # Replaying a ballot that is already in the database is skipped, not doubled
+            commit_ballots([dict(json.loads(pending[0].data), id=str(uuid.uuid4()), voter_pk=voter.id, timestamp=time.time())])
+            assert Vote.query.filter_by(election_id=election_id).count() == 1, "A replayed ballot should be skipped"
+            
+            response = client.post(f"/vote/{election_id}", data={"candidate": candidate_id})
+            with client.session_transaction() as session:
+                messages = [message for _, message in session.get("_flashes", [])]
+            assert "You have already voted in this election." in messages, "A second vote should be refused"
+        finally:
+            app.config["WTF_CSRF_ENABLED"] = True
+    
+    print("✅ Ballot queue tests passed!")
+
+def test_seal_scheduler():
+    """Test that blocks are sealed on a full batch or an expired deadline"""
+    print("🧪 Testing Seal Scheduler...")
+    
+    scheduler = SealScheduler(batch_size=3, max_latency=2.0, poll_interval=1.0)
+    assert scheduler.delay(3, 100.0, now=100.0) == 0, "A full batch should be sealed right away"
+    assert scheduler.delay(1, 100.0, now=101.5) == 0.5, "A partial batch should wait for its deadline"
+    assert scheduler.delay(1, 100.0, now=103.0) == 0, "An expired deadline should seal a partial batch"
+    assert scheduler.delay(0, None) == scheduler.poll_interval, "An idle miner should only poll"
+    
+    # A vote cast in the same process wakes the miner before the timeout
+    waker = threading.Timer(0.05, scheduler.notify)
+    waker.start()
+    started = time.time()
+    scheduler.wait(5.0)
+    assert time.time() - started < 1.0, "notify() should wake a waiting miner"
+    
+    blockchain = Blockchain()
+    blockchain.difficulty = 1
+    metrics = InclusionMetrics(blockchain)
+    blockchain.add_transaction("voter_1", "election", {"type": "vote", "candidate": "Alice"}, timestamp=time.time() - 1.5)
+    blockchain.mine_pending_transactions("system")
+    snapshot = metrics.snapshot()
+    assert snapshot["votes_sealed"] == 1 and snapshot["inclusion_latency_p99"] >= 1.5, "Inclusion latency should be measured"
+    
+    response = app.test_client().get("/api/metrics")
+    assert response.status_code == 200 and "votes_per_second" in response.get_json()
+    
+    print("✅ Seal scheduler tests passed!")
+
+def test_query_budgets():
+    """Test that list pages stay within their SQL statement budgets"""
+    print("🧪 Testing Query Budgets...")
+    
+    client = app.test_client()
+    app.config["ENFORCE_QUERY_BUDGETS"] = True
+    app.testing = True
+    try:
+        with app.app_context():
+            election = Election.query.first()
+        for url in ("/", "/elections", f"/results/{election.id}"):
+            assert client.get(url).status_code == 200, f"{url} should render within its budget"
+        
+        # A tighter budget simulates an N+1 regression on the page
+        budgets = app.extensions["query_budgets"]
+        budgets["elections"], original = 1, budgets["elections"]
+        try:
+            client.get("/elections")
+            assert False, "Exceeding the budget should fail the request"
+        except QueryBudgetExceeded:
+            pass
+        finally:
+            budgets["elections"] = original
+    finally:
+        app.config["ENFORCE_QUERY_BUDGETS"] = False
+        app.testing = False
+    
+    print("✅ Query budget tests passed!")
+
+def test_blockchain_export():
+    """Test the streamed and paginated blockchain export endpoints"""
+    print("🧪 Testing Blockchain Export...")
+    
+    client = app.test_client()
+    
+    response = client.get("/api/blockchain")
+    assert json.loads(response.get_data(as_text=True)) == json.loads(json.dumps(app_blockchain.to_dict())), "Streamed export should match to_dict()"
+    
+    lines = client.get("/api/blockchain/export.ndjson").get_data(as_text=True).splitlines()
+    assert len(lines) == len(app_blockchain.chain), "NDJSON export should have one line per block"
+    assert json.loads(lines[0])["index"] == 0, "NDJSON export should start at the genesis block"
+    
+    page = client.get("/api/blockchain/blocks?from=0&limit=1").get_json()
+    assert [block["index"] for block in page["blocks"]] == [0], "Page should start at the cursor"
+    assert page["next"] == (1 if len(app_blockchain.chain) > 1 else None), "Next cursor should follow the page"
+    
+    print("✅ Blockchain export tests passed!")
+
 def run_demo():
     """Run a complete demo of the voting system"""
     print("🎬 Running Complete Demo...")
@@ -208,9 +1042,30 @@ def main():
         
         # Run tests
         test_blockchain()
+        test_tally_index()
+        test_duplicate_votes()
+        test_compact_representation()
+        test_binary_encoding()
+        test_block_header_hashing()
+        test_merkle_proof()
+        test_parallel_mining()
+        test_incremental_validation()
+        test_proof_of_authority()
+        test_results_cache()
+        test_results_stream()
+        test_block_store()
+        test_transaction_index()
         test_database()
         test_voting_process()
+        test_vote_constraints()
+        test_sqlite_tuning()
         test_blockchain_integration()
+        test_seal_pending_transactions()
+        test_seal_retry_after_failure()
+        test_ballot_queue()
+        test_seal_scheduler()
+        test_query_budgets()
+        test_blockchain_export()
         run_demo()
         
         print("\n🎉 All tests completed successfully!")